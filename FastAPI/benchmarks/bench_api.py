@@ -0,0 +1,227 @@
+"""
+Benchmark de carga da API Bancária
+
+Executa src.main:app no próprio processo, via ASGI, contra um arquivo SQLite
+temporário, com vários clientes simulados concorrentes. As fases são: login,
+criação de contas e uma carga mista de depósitos/saques (com contas "quentes"
+concentrando a maior parte dos lançamentos) e leituras de extrato.
+
+Para cada endpoint são reportados requisições por segundo e latências p50,
+p95 e p99. O resultado pode ser salvo em JSON e comparado com um baseline:
+
+    python -m benchmarks.bench_api --saida resultado.json
+    python -m benchmarks.bench_api --baseline resultado.json --tolerancia 0.2
+
+A comparação termina com código de saída 1 se algum endpoint regredir além
+da tolerância (p95 maior ou req/s menor).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+_diretorio = tempfile.mkdtemp(prefix="bench_api_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_diretorio}/bench.db"
+
+import httpx  # noqa: E402
+
+from src.main import app  # noqa: E402
+
+
+class Coletor:
+    """Acumula latências e status por endpoint e a duração de cada fase"""
+
+    def __init__(self):
+        self.latencias: dict[str, list[float]] = {}
+        self.erros: dict[str, int] = {}
+        self.duracoes: dict[str, float] = {}
+
+    async def medir(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        inicio = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            response = None
+        self.latencias.setdefault(endpoint, []).append(time.perf_counter() - inicio)
+        if response is None or response.status_code >= 500:
+            self.erros[endpoint] = self.erros.get(endpoint, 0) + 1
+        return response
+
+    def resumo(self, fase_por_endpoint: dict[str, str]) -> dict:
+        endpoints = {}
+        for endpoint, latencias in self.latencias.items():
+            ordenadas = sorted(latencias)
+            duracao = self.duracoes[fase_por_endpoint[endpoint]]
+            endpoints[endpoint] = {
+                "requisicoes": len(ordenadas),
+                "erros": self.erros.get(endpoint, 0),
+                "req_por_segundo": len(ordenadas) / duracao,
+                "p50_ms": _percentil(ordenadas, 50) * 1000,
+                "p95_ms": _percentil(ordenadas, 95) * 1000,
+                "p99_ms": _percentil(ordenadas, 99) * 1000,
+            }
+        return endpoints
+
+
+def _percentil(ordenadas: list[float], percentil: float) -> float:
+    indice = max(0, min(len(ordenadas) - 1, round(percentil / 100 * len(ordenadas)) - 1))
+    return ordenadas[indice]
+
+
+async def _em_paralelo(clientes: int, total: int, tarefa) -> None:
+    proximo = iter(range(total))
+
+    async def trabalhador(cliente: int):
+        for i in proximo:
+            await tarefa(cliente, i)
+
+    await asyncio.gather(*[trabalhador(cliente) for cliente in range(clientes)])
+
+
+async def run(args: argparse.Namespace) -> dict:
+    coletor = Coletor()
+    fases = {
+        "POST /auth/login": "login",
+        "POST /contas/": "contas",
+        "POST /transacoes/contas/{conta_id}": "misto",
+        "GET /transacoes/contas/{conta_id}/extrato": "misto",
+    }
+    rng = random.Random(args.seed)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            tokens: list[str] = []
+
+            async def login(cliente: int, i: int):
+                response = await coletor.medir(
+                    client, "POST /auth/login", "POST", "/auth/login", json={"user_id": i % args.clientes + 1}
+                )
+                if response is not None and response.status_code == 200 and len(tokens) < args.clientes:
+                    tokens.append(response.json()["access_token"])
+
+            inicio = time.perf_counter()
+            await _em_paralelo(args.clientes, max(args.logins, args.clientes), login)
+            coletor.duracoes["login"] = time.perf_counter() - inicio
+            headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+            conta_ids: list[int] = []
+
+            async def criar_conta(cliente: int, i: int):
+                response = await coletor.medir(
+                    client,
+                    "POST /contas/",
+                    "POST",
+                    "/contas/",
+                    json={"numero": f"{i:08d}", "titular": f"Titular {i}"},
+                    headers=headers[cliente % len(headers)],
+                )
+                if response is not None and response.status_code == 201:
+                    conta_ids.append(response.json()["id"])
+
+            inicio = time.perf_counter()
+            await _em_paralelo(args.clientes, args.contas, criar_conta)
+            coletor.duracoes["contas"] = time.perf_counter() - inicio
+
+            # Distribuição de Zipf: poucas contas recebem a maior parte dos lançamentos
+            pesos = [1 / (posicao + 1) ** args.zipf for posicao in range(len(conta_ids))]
+
+            async def misto(cliente: int, i: int):
+                conta_id = rng.choices(conta_ids, weights=pesos)[0]
+                if rng.random() < args.proporcao_extrato:
+                    await coletor.medir(
+                        client,
+                        "GET /transacoes/contas/{conta_id}/extrato",
+                        "GET",
+                        f"/transacoes/contas/{conta_id}/extrato",
+                        headers=headers[cliente % len(headers)],
+                    )
+                else:
+                    tipo = "deposito" if rng.random() < 0.6 else "saque"
+                    await coletor.medir(
+                        client,
+                        "POST /transacoes/contas/{conta_id}",
+                        "POST",
+                        f"/transacoes/contas/{conta_id}",
+                        json={"tipo": tipo, "valor": round(rng.uniform(1, 200), 2)},
+                        headers=headers[cliente % len(headers)],
+                    )
+
+            inicio = time.perf_counter()
+            await _em_paralelo(args.clientes, args.operacoes, misto)
+            coletor.duracoes["misto"] = time.perf_counter() - inicio
+
+    return {
+        "gerado_em": datetime.now(timezone.utc).isoformat(),
+        "parametros": {
+            chave: valor for chave, valor in vars(args).items() if chave not in ("saida", "baseline", "tolerancia")
+        },
+        "endpoints": coletor.resumo(fases),
+    }
+
+
+def imprimir(resultado: dict) -> None:
+    print(f"{'endpoint':<44} {'req':>6} {'erros':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, m in resultado["endpoints"].items():
+        print(
+            f"{endpoint:<44} {m['requisicoes']:>6} {m['erros']:>6} {m['req_por_segundo']:>9.1f} "
+            f"{m['p50_ms']:>8.2f} {m['p95_ms']:>8.2f} {m['p99_ms']:>8.2f}"
+        )
+
+
+def comparar(resultado: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """Lista os endpoints que regrediram em relação ao baseline"""
+    regressoes = []
+    for endpoint, atual in resultado["endpoints"].items():
+        anterior = baseline["endpoints"].get(endpoint)
+        if anterior is None:
+            continue
+        if atual["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia):
+            regressoes.append(f"{endpoint}: p95 {anterior['p95_ms']:.2f}ms -> {atual['p95_ms']:.2f}ms")
+        if atual["req_por_segundo"] < anterior["req_por_segundo"] * (1 - tolerancia):
+            regressoes.append(
+                f"{endpoint}: req/s {anterior['req_por_segundo']:.1f} -> {atual['req_por_segundo']:.1f}"
+            )
+    return regressoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=50, help="clientes simulados concorrentes")
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--contas", type=int, default=200)
+    parser.add_argument("--operacoes", type=int, default=5000, help="requisições da fase mista")
+    parser.add_argument("--proporcao-extrato", type=float, default=0.2, help="fração de leituras de extrato")
+    parser.add_argument("--zipf", type=float, default=1.1, help="concentração dos lançamentos nas contas quentes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON para salvar o resultado")
+    parser.add_argument("--baseline", help="arquivo JSON de um resultado anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="variação aceita antes de acusar regressão")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(run(args))
+    imprimir(resultado)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResultado salvo em {args.saida}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            print("\nRegressões em relação ao baseline:")
+            for regressao in regressoes:
+                print(f"  - {regressao}")
+            sys.exit(1)
+        print("\nSem regressões em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
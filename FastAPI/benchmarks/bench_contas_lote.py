@@ -0,0 +1,71 @@
+"""
+Benchmark de importação de contas em lote
+
+Compara a criação de contas uma a uma (ContaService.create) com a importação
+em lote (ContaService.create_lote), contra um arquivo SQLite temporário. Uma
+parte dos números já existe, para exercitar a verificação de duplicados.
+Execute a partir da raiz do projeto:
+
+    python -m benchmarks.bench_contas_lote --contas 20000 --duplicadas 0.1
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_diretorio = tempfile.mkdtemp(prefix="bench_contas_lote_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_diretorio}/bench.db"
+
+from src.database import connect_db, database, disconnect_db  # noqa: E402
+from src.exceptions import DuplicateContaError  # noqa: E402
+from src.models.conta import contas  # noqa: E402
+from src.schema import init_schema  # noqa: E402
+from src.schemas.conta import ContaIn  # noqa: E402
+from src.services.conta import ContaService  # noqa: E402
+
+
+async def run(total_contas: int, duplicadas: float) -> None:
+    init_schema()
+    await connect_db()
+    try:
+        service = ContaService()
+        existentes = int(total_contas * duplicadas)
+        for prefixo in ("a", "b"):
+            await database.execute_many(
+                contas.insert(),
+                [{"numero": f"{prefixo}{i:08d}", "titular": "Existente", "saldo": 0.0} for i in range(existentes)],
+            )
+
+        itens = [ContaIn(numero=f"a{i:08d}", titular=f"Titular {i}") for i in range(total_contas)]
+        inicio = time.perf_counter()
+        for item in itens:
+            try:
+                await service.create(item)
+            except DuplicateContaError:
+                pass
+        individual = time.perf_counter() - inicio
+
+        itens = [ContaIn(numero=f"b{i:08d}", titular=f"Titular {i}") for i in range(total_contas)]
+        inicio = time.perf_counter()
+        resultados = await service.create_lote(itens)
+        lote = time.perf_counter() - inicio
+        criadas = sum(1 for resultado in resultados if resultado["id"] is not None)
+
+        print(f"Contas: {total_contas} ({existentes} já existentes)")
+        print(f"Uma a uma: {individual:.3f}s ({total_contas / individual:,.0f} contas/s)")
+        print(f"Em lote:   {lote:.3f}s ({total_contas / lote:,.0f} contas/s), {criadas} criadas")
+    finally:
+        await disconnect_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contas", type=int, default=20000)
+    parser.add_argument("--duplicadas", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(run(args.contas, args.duplicadas))
+
+
+if __name__ == "__main__":
+    main()
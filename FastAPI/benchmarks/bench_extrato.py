@@ -0,0 +1,148 @@
+"""
+Benchmark de serialização do extrato
+
+Compara o caminho antigo (objetos ``TransacaoOut`` montados à mão e
+revalidados pelo ``response_model`` do FastAPI antes do ``JSONResponse``) com o
+caminho de ``model_response`` (validação e serialização compiladas, uma única
+vez) para uma página de extrato com todas as transações da conta, e mede os
+formatos negociados por ``model_response``: JSON, JSON com gzip e MessagePack,
+incluindo a decodificação no cliente. Execute a partir da raiz do projeto:
+
+    python -m benchmarks.bench_extrato --transacoes 10000 --repeticoes 20
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+
+_diretorio = tempfile.mkdtemp(prefix="bench_extrato_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_diretorio}/bench.db"
+
+from fastapi import Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from src.database import connect_db, database, disconnect_db  # noqa: E402
+from src.models.conta import contas  # noqa: E402
+from src.responses import as_dicts, model_response, msgpack  # noqa: E402
+from src.schema import init_schema  # noqa: E402
+from src.schemas.transacao import ContaExtrato, ExtratoOut, TransacaoLoteIn, TransacaoOut  # noqa: E402
+from src.services.transacao import TransacaoService  # noqa: E402
+
+_campo_extrato = create_response_field(name="extrato", type_=ExtratoOut)
+
+
+async def antes(conta, transacoes) -> bytes:
+    """Caminho anterior: modelos montados no controller e revalidados pelo FastAPI"""
+    extrato = ExtratoOut(
+        conta=ContaExtrato(id=conta.id, numero=conta.numero, titular=conta.titular),
+        transacoes=[TransacaoOut(**dict(trans)) for trans in transacoes],
+        saldo_atual=float(conta.saldo),
+        proximo_cursor=None,
+    )
+    conteudo = await serialize_response(field=_campo_extrato, response_content=extrato)
+    return JSONResponse(content=conteudo).body
+
+
+async def depois(conta, transacoes) -> bytes:
+    return model_response(
+        ExtratoOut,
+        {
+            "conta": {"id": conta.id, "numero": conta.numero, "titular": conta.titular},
+            "transacoes": as_dicts(transacoes),
+            "saldo_atual": float(conta.saldo),
+            "proximo_cursor": None,
+        },
+    ).body
+
+
+def requisicao(**headers: str) -> Request:
+    cabecalhos = [(nome.replace("_", "-").encode(), valor.encode()) for nome, valor in headers.items()]
+    return Request({"type": "http", "headers": cabecalhos})
+
+
+FORMATOS = {
+    "JSON": (requisicao(accept_encoding="identity"), json.loads),
+    "JSON + gzip": (requisicao(accept_encoding="gzip"), lambda corpo: json.loads(gzip.decompress(corpo))),
+}
+if msgpack is not None:
+    FORMATOS["MessagePack"] = (requisicao(accept="application/msgpack"), msgpack.unpackb)
+
+
+def negociado(conta, transacoes, request: Request) -> bytes:
+    return model_response(
+        ExtratoOut,
+        {
+            "conta": {"id": conta.id, "numero": conta.numero, "titular": conta.titular},
+            "transacoes": as_dicts(transacoes),
+            "saldo_atual": float(conta.saldo),
+            "proximo_cursor": None,
+        },
+        request=request,
+    ).body
+
+
+def medir_formato(conta, transacoes, request: Request, decodificar, repeticoes: int) -> tuple[float, float, int]:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        corpo = negociado(conta, transacoes, request)
+    servidor = (time.perf_counter() - inicio) / repeticoes
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        decodificar(corpo)
+    return servidor, (time.perf_counter() - inicio) / repeticoes, len(corpo)
+
+
+async def medir(caminho, conta, transacoes, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        await caminho(conta, transacoes)
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+async def run(total_transacoes: int, repeticoes: int) -> None:
+    init_schema()
+    await connect_db()
+    try:
+        conta_id = await database.execute(contas.insert(), {"numero": "00000001", "titular": "Titular", "saldo": 0.0})
+        service = TransacaoService()
+        itens = [
+            TransacaoLoteIn(conta_id=conta_id, tipo="deposito", valor=10.0, descricao=f"Depósito {i}")
+            for i in range(total_transacoes)
+        ]
+        await service.create_lote(itens)
+
+        conta = await database.fetch_one(contas.select().where(contas.c.id == conta_id))
+        transacoes = await service.get_by_conta(conta_id, limit=total_transacoes)
+
+        tempo_antes = await medir(antes, conta, transacoes, repeticoes)
+        tempo_depois = await medir(depois, conta, transacoes, repeticoes)
+        tamanho = len(await depois(conta, transacoes))
+
+        print(f"Extrato com {len(transacoes)} transações ({tamanho / 1024:,.0f} KiB de JSON)")
+        print(f"Antes (response_model + JSONResponse): {tempo_antes * 1000:.1f} ms")
+        print(f"Depois (model_response):               {tempo_depois * 1000:.1f} ms")
+        print(f"Ganho: {tempo_antes / tempo_depois:.1f}x")
+
+        print(f"{'Formato':<13} {'servidor':>9} {'cliente':>9} {'tamanho':>11}")
+        for nome, (request, decodificar) in FORMATOS.items():
+            servidor, cliente, tamanho = medir_formato(conta, transacoes, request, decodificar, repeticoes)
+            print(f"{nome:<13} {servidor * 1000:>6.1f} ms {cliente * 1000:>6.1f} ms {tamanho / 1024:>7,.0f} KiB")
+    finally:
+        await disconnect_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transacoes", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.transacoes, args.repeticoes))
+
+
+if __name__ == "__main__":
+    main()
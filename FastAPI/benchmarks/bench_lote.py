@@ -0,0 +1,72 @@
+"""
+Benchmark de ingestão de transações em lote
+
+Mede lançamentos por segundo de TransacaoService.create_lote contra um
+arquivo SQLite temporário. Execute a partir da raiz do projeto:
+
+    python -m benchmarks.bench_lote --contas 100 --transacoes 20000 --tamanho-lote 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+_diretorio = tempfile.mkdtemp(prefix="bench_lote_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_diretorio}/bench.db"
+
+from src.database import connect_db, database, disconnect_db  # noqa: E402
+from src.models.conta import contas  # noqa: E402
+from src.schema import init_schema  # noqa: E402
+from src.schemas.transacao import TransacaoLoteIn  # noqa: E402
+from src.services.transacao import TransacaoService  # noqa: E402
+
+
+async def run(total_contas: int, total_transacoes: int, tamanho_lote: int) -> None:
+    init_schema()
+    await connect_db()
+    try:
+        await database.execute_many(
+            contas.insert(),
+            [{"numero": f"{i:08d}", "titular": f"Titular {i}", "saldo": 0.0} for i in range(total_contas)],
+        )
+        conta_ids = [row.id for row in await database.fetch_all(contas.select())]
+
+        rng = random.Random(42)
+        itens = [
+            TransacaoLoteIn(
+                conta_id=rng.choice(conta_ids),
+                tipo="deposito" if rng.random() < 0.6 else "saque",
+                valor=round(rng.uniform(1, 500), 2),
+            )
+            for _ in range(total_transacoes)
+        ]
+
+        service = TransacaoService()
+        criadas = 0
+        inicio = time.perf_counter()
+        for i in range(0, len(itens), tamanho_lote):
+            resultados = await service.create_lote(itens[i : i + tamanho_lote])
+            criadas += sum(1 for resultado in resultados if resultado["id"] is not None)
+        duracao = time.perf_counter() - inicio
+
+        print(f"Itens processados: {total_transacoes} em lotes de {tamanho_lote}")
+        print(f"Transações criadas: {criadas} (recusadas: {total_transacoes - criadas})")
+        print(f"Duração: {duracao:.3f}s")
+        print(f"Lançamentos por segundo: {total_transacoes / duracao:,.0f}")
+    finally:
+        await disconnect_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contas", type=int, default=100)
+    parser.add_argument("--transacoes", type=int, default=20000)
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.contas, args.transacoes, args.tamanho_lote))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark de estresse de transferências concorrentes
+
+Clientes concorrentes transferem entre poucas contas, metade das vezes no
+sentido oposto ao de outro cliente, com commit por requisição e com o
+WriteBatcher habilitado. Ao final confere que nenhum valor foi criado ou
+perdido: a soma dos saldos não muda e o saldo de cada conta bate com as
+transferências gravadas. Execute a partir da raiz do projeto:
+
+    python -m benchmarks.bench_transferencias --clientes 50 --transferencias 40 --contas 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+_diretorio = tempfile.mkdtemp(prefix="bench_transferencias_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_diretorio}/bench.db"
+
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from src.database import connect_db, database, disconnect_db, write_batcher  # noqa: E402
+from src.models.conta import contas  # noqa: E402
+from src.models.transacao import transacoes  # noqa: E402
+from src.models.transferencia import transferencias  # noqa: E402
+from src.schema import init_schema  # noqa: E402
+from src.schemas.transferencia import TransferenciaIn  # noqa: E402
+from src.services.transferencia import TransferenciaService  # noqa: E402
+
+SALDO_INICIAL = 1000.0
+
+
+async def cliente(service: TransferenciaService, conta_ids: list[int], total: int, seed: int) -> tuple[list, int]:
+    rng = random.Random(seed)
+    latencias = []
+    recusadas = 0
+    for _ in range(total):
+        origem, destino = rng.sample(conta_ids, 2)
+        if seed % 2:
+            origem, destino = destino, origem
+        transferencia = TransferenciaIn(
+            conta_origem_id=origem, conta_destino_id=destino, valor=round(rng.uniform(1, 200), 2)
+        )
+        inicio = time.perf_counter()
+        try:
+            await service.create(transferencia)
+        except HTTPException:
+            recusadas += 1
+        latencias.append(time.perf_counter() - inicio)
+    return latencias, recusadas
+
+
+async def conferir(conta_ids: list[int]) -> None:
+    """Confere a conservação do dinheiro e a consistência das pernas gravadas"""
+    total = await database.fetch_val(select(func.sum(contas.c.saldo)))
+    esperado = SALDO_INICIAL * len(conta_ids)
+    assert abs(total - esperado) < 1e-6, f"Soma dos saldos {total} difere de {esperado}"
+
+    for conta_id in conta_ids:
+        saldo = await database.fetch_val(select(contas.c.saldo).where(contas.c.id == conta_id))
+        creditos = await database.fetch_val(
+            select(func.coalesce(func.sum(transferencias.c.valor), 0.0)).where(
+                transferencias.c.conta_destino_id == conta_id
+            )
+        )
+        debitos = await database.fetch_val(
+            select(func.coalesce(func.sum(transferencias.c.valor), 0.0)).where(
+                transferencias.c.conta_origem_id == conta_id
+            )
+        )
+        assert abs(saldo - (SALDO_INICIAL + creditos - debitos)) < 1e-6, f"Saldo inconsistente na conta {conta_id}"
+
+    pernas = await database.fetch_val(select(func.count()).select_from(transacoes))
+    gravadas = await database.fetch_val(select(func.count()).select_from(transferencias))
+    assert pernas == 2 * gravadas, f"{pernas} transações para {gravadas} transferências"
+
+
+async def medir(nome: str, clientes: int, total: int, total_contas: int) -> None:
+    await database.execute(transferencias.delete())
+    await database.execute(transacoes.delete())
+    await database.execute(contas.delete())
+    await database.execute_many(
+        contas.insert(),
+        [{"numero": f"{i:08d}", "titular": f"Titular {i}", "saldo": SALDO_INICIAL} for i in range(total_contas)],
+    )
+    conta_ids = [row.id for row in await database.fetch_all(contas.select())]
+
+    service = TransferenciaService()
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*[cliente(service, conta_ids, total, seed) for seed in range(clientes)])
+    duracao = time.perf_counter() - inicio
+
+    await conferir(conta_ids)
+    latencias = sorted(latencia for latencias, _ in resultados for latencia in latencias)
+    recusadas = sum(recusadas for _, recusadas in resultados)
+    feitas = len(latencias)
+    p99 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))]
+    print(
+        f"{nome:<24} {feitas} tentativas em {duracao:.3f}s -> {feitas / duracao:,.0f}/s "
+        f"(recusadas: {recusadas}, p50 {statistics.median(latencias) * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms)"
+    )
+
+
+async def run(clientes: int, total: int, total_contas: int) -> None:
+    init_schema()
+    await connect_db()
+    try:
+        await medir("commit por requisição", clientes, total, total_contas)
+
+        await write_batcher.start()
+        await medir("group commit", clientes, total, total_contas)
+        await write_batcher.stop()
+        print("Saldos conferidos: nenhuma transferência parcial e soma preservada")
+    finally:
+        await disconnect_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--transferencias", type=int, default=40)
+    parser.add_argument("--contas", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.clientes, args.transferencias, args.contas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark do group commit de lançamentos
+
+Compara lançamentos por segundo de TransacaoService.create com um commit por
+requisição e com o WriteBatcher habilitado, usando clientes concorrentes
+contra um arquivo SQLite temporário. Execute a partir da raiz do projeto:
+
+    python -m benchmarks.bench_write_batcher --clientes 50 --lancamentos 40
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+_diretorio = tempfile.mkdtemp(prefix="bench_write_batcher_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_diretorio}/bench.db"
+
+from src.database import connect_db, database, disconnect_db, write_batcher  # noqa: E402
+from src.models.conta import contas  # noqa: E402
+from src.models.transacao import transacoes  # noqa: E402
+from src.schema import init_schema  # noqa: E402
+from src.schemas.transacao import TransacaoIn  # noqa: E402
+from src.services.transacao import TransacaoService  # noqa: E402
+
+
+async def cliente(service: TransacaoService, conta_ids: list[int], lancamentos: int, seed: int) -> int:
+    rng = random.Random(seed)
+    erros = 0
+    for _ in range(lancamentos):
+        transacao = TransacaoIn(tipo="deposito", valor=round(rng.uniform(1, 100), 2))
+        try:
+            await service.create(rng.choice(conta_ids), transacao)
+        except Exception:
+            erros += 1
+    return erros
+
+
+async def medir(nome: str, clientes: int, lancamentos: int, total_contas: int) -> float:
+    await database.execute(transacoes.delete())
+    await database.execute(contas.delete())
+    await database.execute_many(
+        contas.insert(),
+        [{"numero": f"{i:08d}", "titular": f"Titular {i}", "saldo": 0.0} for i in range(total_contas)],
+    )
+    conta_ids = [row.id for row in await database.fetch_all(contas.select())]
+
+    service = TransacaoService()
+    inicio = time.perf_counter()
+    erros = await asyncio.gather(*[cliente(service, conta_ids, lancamentos, seed) for seed in range(clientes)])
+    duracao = time.perf_counter() - inicio
+
+    total = clientes * lancamentos
+    taxa = (total - sum(erros)) / duracao
+    print(f"{nome:<24} {total} lançamentos em {duracao:.3f}s -> {taxa:,.0f}/s (erros: {sum(erros)})")
+    return taxa
+
+
+async def run(clientes: int, lancamentos: int, total_contas: int) -> None:
+    init_schema()
+    await connect_db()
+    try:
+        sem_lote = await medir("commit por requisição", clientes, lancamentos, total_contas)
+
+        await write_batcher.start()
+        com_lote = await medir("group commit", clientes, lancamentos, total_contas)
+        print(f"Lotes: {write_batcher.batches}, média de {write_batcher.operations / write_batcher.batches:.1f} por lote")
+        await write_batcher.stop()
+
+        print(f"Ganho: {com_lote / sem_lote:.1f}x")
+    finally:
+        await disconnect_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--lancamentos", type=int, default=40)
+    parser.add_argument("--contas", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.clientes, args.lancamentos, args.contas))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,15 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 
-from src.database import engine, metadata  # noqa
+from src.database import create_sync_engine, metadata  # noqa
+from src.models.checkpoint import checkpoints  # noqa
 from src.models.conta import contas  # noqa
+from src.models.idempotencia import idempotencias  # noqa
+from src.models.post import posts  # noqa
+from src.models.saldo_snapshot import saldos_snapshot  # noqa
 from src.models.transacao import transacoes  # noqa
+from src.models.transacao_arquivo import transacoes_arquivo  # noqa
+from src.models.transferencia import transferencias  # noqa
 
 target_metadata = metadata
 
@@ -52,7 +58,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine
+    connectable = create_sync_engine()
 
     with connectable.connect() as connection:
         context.configure(connection=connection, target_metadata=target_metadata)
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from databases import Database
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+class WriteBatcher:
+    """Agrupa escritas concorrentes em uma única transação (group commit).
+
+    Operações enviadas dentro da janela de ``window_ms`` milissegundos, até
+    ``max_size`` operações, são executadas em sequência na mesma transação,
+    cada uma em seu próprio savepoint. Cada chamador recebe o próprio
+    resultado ou erro somente depois do commit do lote.
+    """
+
+    def __init__(self, database: Database, window_ms: float, max_size: int):
+        self.database = database
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.batches = 0
+        self.operations = 0
+        self._queue: asyncio.Queue[tuple[Operation, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("WriteBatcher encerrado"))
+
+    async def submit(self, operation: Operation) -> Any:
+        """Enfileira uma operação de escrita e aguarda o commit do lote que a contém"""
+        if self._task is None:
+            raise RuntimeError("WriteBatcher não iniciado")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._commit(batch)
+
+    async def _commit(self, batch: list[tuple[Operation, asyncio.Future]]) -> None:
+        results = []
+        try:
+            async with self.database.transaction():
+                for operation, future in batch:
+                    try:
+                        async with self.database.transaction():
+                            results.append((future, await operation(), None))
+                    except Exception as exc:
+                        results.append((future, None, exc))
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for future, result, exc in results:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
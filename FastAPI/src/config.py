@@ -6,6 +6,45 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Quantidade máxima de tokens verificados mantidos em memória (0 desativa o cache)
+    token_cache_size: int = 1024
+    # Cache de contas por processo (0 desativa o cache)
+    conta_cache_size: int = 10000
+    conta_cache_ttl_seconds: float = 5.0
+    # Group commit: lançamentos concorrentes confirmados juntos em uma única transação
+    write_batch_enabled: bool = False
+    write_batch_window_ms: float = 2.0
+    write_batch_max_size: int = 100
+    # Lançamentos de uma mesma conta são serializados no processo, em locks compartilhados por listras
+    conta_lock_stripes: int = 1024
+    # Escritas recusadas com "database is locked" são repetidas com espera exponencial e jitter
+    write_retry_attempts: int = 5
+    write_retry_base_delay_ms: float = 10.0
+    # Respostas de Idempotency-Key: validade e quantidade mantida em memória
+    idempotency_ttl_seconds: float = 86400.0
+    idempotency_cache_size: int = 10000
+    # Arquivamento: transações mais antigas que o horizonte vão para transacoes_arquivo
+    arquivo_horizonte_dias: int = 365
+    arquivo_lote: int = 1000
+    # Stream de eventos das contas (SSE): eventos pendentes por ouvinte e intervalo de keep-alive
+    eventos_queue_size: int = 100
+    eventos_heartbeat_seconds: float = 15.0
+    # Respostas JSON a partir deste tamanho são comprimidas quando o cliente aceita gzip (0 comprime todas)
+    gzip_min_size: int = 1024
+    gzip_compresslevel: int = 5
+    # Cria as tabelas na inicialização (fora do event loop); desative nos workers
+    # e rode "python -m src.jobs.schema" uma vez antes de subi-los
+    schema_init_on_startup: bool = True
+    # Consultas acima do limite são registradas com SQL, origem e plano (0 desativa)
+    slow_query_threshold_ms: float = 100.0
+    slow_query_explain: bool = True
+    # Perfil de desempenho do SQLite: uma conexão de escrita e um pool de conexões somente leitura
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -20000  # negativo: tamanho em KiB
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_pool_size: int = 4  # 0 envia as leituras para a conexão de escrita
 
     class Config:
         env_file = ".env"
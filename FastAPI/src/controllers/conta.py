@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, status
+import asyncio
+from datetime import datetime, timezone
 
-from src.schemas.conta import ContaIn, ContaOut
+from fastapi import APIRouter, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from src.config import settings
+from src.events import broker
+from src.responses import etag_matches, make_etag, model_response, not_modified
+from src.schemas.conta import ContaIn, ContaOut, LoteContasIn, LoteContasOut, SaldoOut
 from src.security import login_required
 from src.services.conta import ContaService
+from src.services.saldo import SaldoService
 
 router = APIRouter(prefix="/contas", tags=["Contas"])
 
 service = ContaService()
+saldo_service = SaldoService()
 
 
 @router.post(
@@ -16,21 +25,105 @@ service = ContaService()
     summary="Criar nova conta corrente",
     description="Cria uma nova conta corrente com saldo inicial zero",
 )
-async def create_conta(conta: ContaIn, user_id: int = Depends(login_required)):
+async def create_conta(conta: ContaIn, request: Request, user_id: int = Depends(login_required)):
     """Endpoint para criar uma nova conta corrente"""
-    conta_id = await service.create(conta)
-    conta_criada = await service.get_by_id(conta_id)
-    return ContaOut(**dict(conta_criada))
+    conta_criada = await service.create(conta)
+    return model_response(ContaOut, dict(conta_criada), status_code=status.HTTP_201_CREATED, request=request)
+
+
+@router.post(
+    "/lote",
+    response_model=LoteContasOut,
+    summary="Importar contas em lote",
+    description="Cria uma lista de contas correntes com saldo inicial zero. Contas com número já existente "
+    "ou repetido no lote são recusadas individualmente e informadas no resultado.",
+)
+async def create_contas_lote(lote: LoteContasIn, request: Request, user_id: int = Depends(login_required)):
+    """Endpoint para importar contas em lote"""
+    resultados = await service.create_lote(lote.contas)
+    total_criadas = sum(1 for resultado in resultados if resultado["id"] is not None)
+    return model_response(
+        LoteContasOut,
+        {"resultados": resultados, "total_criadas": total_criadas, "total_recusadas": len(resultados) - total_criadas},
+        request=request,
+    )
 
 
 @router.get(
     "/{conta_id}",
     response_model=ContaOut,
     summary="Buscar conta por ID",
-    description="Retorna os dados de uma conta corrente específica",
+    description="Retorna os dados de uma conta corrente específica. "
+    "Responde 304 quando `If-None-Match` traz a ETag da versão atual da conta.",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Conta não alterada desde a ETag informada"}},
 )
-async def get_conta(conta_id: int, user_id: int = Depends(login_required)):
+async def get_conta(
+    conta_id: int,
+    request: Request,
+    if_none_match: str | None = Header(None),
+    user_id: int = Depends(login_required),
+):
     """Endpoint para buscar uma conta por ID"""
-    conta = await service.get_by_id(conta_id)
-    return ContaOut(**dict(conta))
+    # Conta e versão da mesma leitura: a ETag sempre corresponde ao saldo enviado
+    conta = await service.get_com_versao(conta_id)
+    etag = make_etag(conta_id, conta.versao)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return model_response(ContaOut, dict(conta), headers={"ETag": etag}, request=request)
+
+
+@router.get(
+    "/{conta_id}/saldo",
+    response_model=SaldoOut,
+    summary="Consultar saldo em um instante",
+    description="Retorna o saldo da conta no instante informado em `em` (UTC quando sem fuso). "
+    "Sem `em`, retorna o saldo atual.",
+)
+async def get_saldo(
+    conta_id: int,
+    request: Request,
+    em: datetime | None = Query(None, description="Instante da consulta, ex.: 2024-01-31T23:59:59Z"),
+    user_id: int = Depends(login_required),
+):
+    """Endpoint para consultar o saldo de uma conta em um instante"""
+    if em is None:
+        em, saldo = datetime.now(timezone.utc), await service.get_saldo(conta_id)
+    else:
+        saldo = await saldo_service.get_saldo_em(conta_id, em)
+    return model_response(SaldoOut, {"conta_id": conta_id, "em": em, "saldo": saldo}, request=request)
+
+
+async def _stream_eventos(conta_id: int):
+    """Eventos SSE das transações da conta, com comentários de keep-alive quando ociosa"""
+    with broker.subscribe(conta_id) as assinatura:
+        yield ": conectado\n\n"
+        while True:
+            try:
+                evento = await asyncio.wait_for(assinatura.get(), timeout=settings.eventos_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if assinatura.perdidos:
+                # O cliente ficou para trás; o próximo evento traz o saldo atual
+                yield f'event: perdidos\ndata: {{"quantidade": {assinatura.perdidos}}}\n\n'
+                assinatura.perdidos = 0
+            yield f"event: transacao\ndata: {evento}\n\n"
 
+
+@router.get(
+    "/{conta_id}/eventos",
+    response_class=StreamingResponse,
+    summary="Acompanhar transações da conta",
+    description="Stream Server-Sent Events com cada transação confirmada na conta e o saldo resultante "
+    "(evento `transacao`). Se o cliente não acompanhar o ritmo, os eventos mais antigos são descartados "
+    "e um evento `perdidos` informa quantos.",
+    responses={status.HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+)
+async def stream_eventos(conta_id: int, user_id: int = Depends(login_required)):
+    """Endpoint para acompanhar as transações de uma conta"""
+    await service.get_by_id(conta_id)
+    return StreamingResponse(
+        _stream_eventos(conta_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
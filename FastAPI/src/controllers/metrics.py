@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.metrics import metrics
+
+router = APIRouter(tags=["Métricas"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics():
+    """Endpoint de métricas no formato texto do Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
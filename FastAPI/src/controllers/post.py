@@ -1,23 +1,51 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 
+from src.pagination import decode_keyset_cursor, encode_keyset_cursor
 from src.schemas.post import PostIn, PostUpdateIn
 from src.security import login_required
 from src.services.post import PostService
-from src.views.post import PostOut
+from src.views.post import PostOut, PostPageOut
 
-router = APIRouter(prefix="/posts", dependencies=[Depends(login_required)])
+router = APIRouter(prefix="/posts", tags=["Posts"], dependencies=[Depends(login_required)])
 
 service = PostService()
 
 
-@router.get("/", response_model=list[PostOut])
-async def read_posts(published: bool, limit: int, skip: int = 0):
-    return await service.read_all(published=published, limit=limit, skip=skip)
+def _page(rows: list, limit: int) -> dict:
+    """Monta a página a partir de ``limit + 1`` registros, gerando o cursor da próxima"""
+    proximo_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        proximo_cursor = encode_keyset_cursor(rows[-1].published_at, rows[-1].id)
+    return {"posts": rows, "proximo_cursor": proximo_cursor}
+
+
+@router.get("/", response_model=PostPageOut)
+async def read_posts(
+    published: bool,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None, description="Cursor retornado em `proximo_cursor` pela página anterior"),
+):
+    apos = decode_keyset_cursor(cursor) if cursor is not None else None
+    rows = await service.read_all(published=published, limit=limit + 1, apos=apos)
+    return _page(rows, limit)
+
+
+@router.get("/search", response_model=PostPageOut)
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="Termos buscados no título e no conteúdo"),
+    published: bool | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None, description="Cursor retornado em `proximo_cursor` pela página anterior"),
+):
+    apos = decode_keyset_cursor(cursor) if cursor is not None else None
+    rows = await service.search(q, limit=limit + 1, published=published, apos=apos)
+    return _page(rows, limit)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=PostOut)
 async def create_post(post: PostIn):
-    return {**post.model_dump(), "id": await service.create(post)}
+    return await service.create(post)
 
 
 @router.get("/{id}", response_model=PostOut)
@@ -32,4 +60,4 @@ async def update_post(id: int, post: PostUpdateIn):
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT, response_model=None)
 async def delete_post(id: int):
-    await service.delete(id)
\ No newline at end of file
+    await service.delete(id)
@@ -1,14 +1,37 @@
-from fastapi import APIRouter, Depends, status
+import csv
+import io
+import json
+from datetime import date, datetime
 
-from src.schemas.transacao import ContaExtrato, ExtratoOut, TransacaoIn, TransacaoOut
+from fastapi import APIRouter, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from src.exceptions import InvalidPeriodError
+from src.pagination import decode_cursor, encode_cursor
+from src.responses import as_dicts, etag_matches, make_etag, model_response, not_modified
+from src.schemas.transacao import (
+    ExtratoOut,
+    FormatoExportacao,
+    Granularidade,
+    LoteTransacoesIn,
+    LoteTransacoesOut,
+    ResumoOut,
+    TransacaoIn,
+    TransacaoOut,
+)
 from src.security import login_required
 from src.services.conta import ContaService
-from src.services.transacao import TransacaoService
+from src.services.saldo import SaldoService
+from src.services.transacao import CAMPOS_CONTA_EXPORTACAO, CAMPOS_EXPORTACAO, TransacaoService
 
 router = APIRouter(prefix="/transacoes", tags=["Transações"])
 
 transacao_service = TransacaoService()
 conta_service = ContaService()
+saldo_service = SaldoService()
+
+# Linhas por bloco enviado ao cliente na exportação
+TAMANHO_BLOCO_EXPORTACAO = 500
 
 
 @router.post(
@@ -17,40 +40,181 @@ conta_service = ContaService()
     response_model=TransacaoOut,
     summary="Criar transação bancária",
     description="Cria uma nova transação (depósito ou saque) para uma conta corrente. "
-    "Valida se o valor é positivo e se há saldo suficiente para saques.",
+    "Valida se o valor é positivo e se há saldo suficiente para saques. "
+    "Com o header `Idempotency-Key`, repetições da mesma chave devolvem a transação já criada; "
+    "a chave reutilizada para outra conta ou outro corpo é recusada com 422.",
 )
 async def create_transacao(
     conta_id: int,
     transacao: TransacaoIn,
+    request: Request,
     user_id: int = Depends(login_required),
+    idempotency_key: str | None = Header(
+        None, max_length=255, description="Chave única da operação, para repetir a requisição com segurança"
+    ),
 ):
     """Endpoint para criar uma transação (depósito ou saque)"""
-    transacao_criada = await transacao_service.create(conta_id, transacao)
-    return TransacaoOut(**dict(transacao_criada))
+    transacao_criada = await transacao_service.create(
+        conta_id, transacao, user_id=user_id, chave_idempotencia=idempotency_key
+    )
+    return model_response(TransacaoOut, dict(transacao_criada), status_code=status.HTTP_201_CREATED, request=request)
+
+
+@router.post(
+    "/lote",
+    response_model=LoteTransacoesOut,
+    summary="Criar lote de transações",
+    description="Aplica uma lista de depósitos e saques, de uma ou mais contas, em uma única transação de banco. "
+    "As transações de cada conta são aplicadas na ordem do lote; itens de contas inexistentes ou sem saldo "
+    "suficiente são recusados individualmente e informados no resultado.",
+)
+async def create_lote(lote: LoteTransacoesIn, request: Request, user_id: int = Depends(login_required)):
+    """Endpoint para criar transações em lote"""
+    resultados = await transacao_service.create_lote(lote.transacoes)
+    total_criadas = sum(1 for resultado in resultados if resultado["id"] is not None)
+    return model_response(
+        LoteTransacoesOut,
+        {"resultados": resultados, "total_criadas": total_criadas, "total_recusadas": len(resultados) - total_criadas},
+        request=request,
+    )
 
 
 @router.get(
     "/contas/{conta_id}/extrato",
     response_model=ExtratoOut,
     summary="Obter extrato bancário",
-    description="Retorna o extrato completo de uma conta corrente, incluindo todas as transações realizadas e o saldo atual",
+    description="Retorna o extrato paginado de uma conta corrente, da transação mais recente para a mais antiga, "
+    "e o saldo atual. Use `proximo_cursor` da resposta como `cursor` para buscar a página seguinte. "
+    "Responde 304 quando `If-None-Match` traz a ETag da versão atual da conta.",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Extrato não alterado desde a ETag informada"}},
 )
-async def get_extrato(conta_id: int, user_id: int = Depends(login_required)):
+async def get_extrato(
+    conta_id: int,
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Quantidade máxima de transações na página"),
+    cursor: str | None = Query(None, description="Cursor retornado em `proximo_cursor` pela página anterior"),
+    if_none_match: str | None = Header(None),
+    user_id: int = Depends(login_required),
+):
     """Endpoint para obter o extrato de uma conta"""
-    # Busca a conta
-    conta = await conta_service.get_by_id(conta_id)
-
-    # Busca todas as transações
-    transacoes_list = await transacao_service.get_by_conta(conta_id)
-
-    # Formata a resposta
-    return ExtratoOut(
-        conta=ContaExtrato(
-            id=conta.id,
-            numero=conta.numero,
-            titular=conta.titular,
-        ),
-        transacoes=[TransacaoOut(**dict(trans)) for trans in transacoes_list],
-        saldo_atual=float(conta.saldo),
+    apos_id = decode_cursor(cursor) if cursor is not None else None
+
+    # Busca a conta e sua versão na mesma leitura, sem cache: sem lançamentos
+    # novos, responde 304 sem buscar o extrato nem serializar
+    conta = await conta_service.get_com_versao(conta_id)
+    etag = make_etag(conta_id, conta.versao)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # Busca uma transação a mais para saber se existe próxima página
+    transacoes_list = await transacao_service.get_by_conta(conta_id, limit=limit + 1, apos_id=apos_id)
+    proximo_cursor = None
+    if len(transacoes_list) > limit:
+        transacoes_list = transacoes_list[:limit]
+        proximo_cursor = encode_cursor(transacoes_list[-1].id)
+
+    # Formata a resposta, validando e serializando uma única vez
+    return model_response(
+        ExtratoOut,
+        {
+            "conta": {"id": conta.id, "numero": conta.numero, "titular": conta.titular},
+            "transacoes": as_dicts(transacoes_list),
+            "saldo_atual": float(conta.saldo),
+            "proximo_cursor": proximo_cursor,
+        },
+        headers={"ETag": etag},
+        request=request,
+    )
+
+
+@router.get(
+    "/contas/{conta_id}/resumo",
+    response_model=ResumoOut,
+    summary="Obter resumo de transações por período",
+    description="Retorna os totais de depósitos e saques da conta agrupados por dia, semana ou mês, "
+    "entre as datas `de` e `ate` (inclusive). Períodos sem transações não aparecem.",
+)
+async def get_resumo(
+    conta_id: int,
+    request: Request,
+    granularidade: Granularidade = Query(Granularidade.DIA, description="Tamanho dos períodos"),
+    de: date | None = Query(None, description="Data inicial (UTC)"),
+    ate: date | None = Query(None, description="Data final (UTC)"),
+    user_id: int = Depends(login_required),
+):
+    """Endpoint para obter o resumo de transações de uma conta"""
+    if de is not None and ate is not None and de > ate:
+        raise InvalidPeriodError
+    periodos = await saldo_service.get_resumo(conta_id, granularidade, de=de, ate=ate)
+    return model_response(
+        ResumoOut, {"conta_id": conta_id, "granularidade": granularidade, "periodos": periodos}, request=request
     )
 
+
+def _valor_exportado(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+async def _exportar_csv(rows, campos: tuple[str, ...]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(campos)
+    async for i, row in _enumerar(rows):
+        writer.writerow([_valor_exportado(valor) for valor in row])
+        if i % TAMANHO_BLOCO_EXPORTACAO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _exportar_ndjson(rows, campos: tuple[str, ...]):
+    linhas = []
+    async for i, row in _enumerar(rows):
+        linhas.append(json.dumps(dict(zip(campos, map(_valor_exportado, row))), ensure_ascii=False))
+        if i % TAMANHO_BLOCO_EXPORTACAO == 0:
+            yield "\n".join(linhas) + "\n"
+            linhas.clear()
+    if linhas:
+        yield "\n".join(linhas) + "\n"
+
+
+async def _enumerar(rows):
+    i = 0
+    async for row in rows:
+        i += 1
+        yield i, row
+
+
+@router.get(
+    "/exportar",
+    response_class=StreamingResponse,
+    summary="Exportar transações",
+    description="Exporta as transações de todas as contas entre as datas `de` e `ate` (inclusive, UTC), "
+    "em ordem de ID, como CSV ou NDJSON. A resposta é enviada em streaming, com memória constante. "
+    "Para retomar uma exportação interrompida, envie em `apos_id` o ID da última transação recebida.",
+    responses={status.HTTP_200_OK: {"content": {"text/csv": {}, "application/x-ndjson": {}}}},
+)
+async def exportar_transacoes(
+    de: date | None = Query(None, description="Data inicial (UTC)"),
+    ate: date | None = Query(None, description="Data final (UTC)"),
+    formato: FormatoExportacao = Query(FormatoExportacao.CSV, description="Formato do arquivo"),
+    incluir_conta: bool = Query(False, description="Inclui número e titular da conta em cada linha"),
+    apos_id: int | None = Query(None, ge=0, description="Exporta só as transações com ID maior que este"),
+    user_id: int = Depends(login_required),
+):
+    """Endpoint para exportar transações em streaming"""
+    if de is not None and ate is not None and de > ate:
+        raise InvalidPeriodError
+
+    campos = CAMPOS_EXPORTACAO + (CAMPOS_CONTA_EXPORTACAO if incluir_conta else ())
+    rows = transacao_service.exportar(de=de, ate=ate, apos_id=apos_id, incluir_conta=incluir_conta)
+    if formato == FormatoExportacao.CSV:
+        conteudo, media_type = _exportar_csv(rows, campos), "text/csv"
+    else:
+        conteudo, media_type = _exportar_ndjson(rows, campos), "application/x-ndjson"
+    return StreamingResponse(
+        conteudo,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transacoes.{formato.value}"'},
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, status
+
+from src.responses import model_response
+from src.schemas.transferencia import TransferenciaIn, TransferenciaOut
+from src.security import login_required
+from src.services.transferencia import TransferenciaService
+
+router = APIRouter(prefix="/transferencias", tags=["Transferências"])
+
+service = TransferenciaService()
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=TransferenciaOut,
+    summary="Transferir entre contas",
+    description="Debita a conta de origem e credita a de destino em uma única transação de banco, "
+    "gravando um saque e um depósito ligados pela transferência. "
+    "Falha sem alterar nenhuma conta se alguma não existir ou se o saldo da origem for insuficiente.",
+)
+async def create_transferencia(transferencia: TransferenciaIn, user_id: int = Depends(login_required)):
+    """Endpoint para transferir entre contas"""
+    transferencia_criada = await service.create(transferencia)
+    return model_response(TransferenciaOut, transferencia_criada, status_code=status.HTTP_201_CREATED)
@@ -1,20 +1,209 @@
+import asyncio
+import random
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable
+
+import aiosqlite
 from databases import Database
 from sqlalchemy import MetaData, create_engine
+from sqlalchemy.engine import Engine
 
+from src.batching import WriteBatcher
 from src.config import settings
+from src.exceptions import DatabaseBusyError
+from src.metrics import metrics
+from src.slow_query import SlowQueryLog
+
+slow_query_log = SlowQueryLog(settings.slow_query_threshold_ms, explain=settings.slow_query_explain)
+
+
+class InstrumentedDatabase(Database):
+    """Database que registra a quantidade e a duração das consultas nas métricas
+    e envia as consultas lentas ao ``slow_query_log``"""
+
+    async def _observe(self, operation: str, inicio: float, query, values) -> None:
+        duration = time.perf_counter() - inicio
+        metrics.observe_query(operation, duration)
+        if slow_query_log.is_slow(duration):
+            await slow_query_log.record(self, operation, query, values, duration)
+
+    async def execute(self, query, values=None):
+        inicio = time.perf_counter()
+        try:
+            return await super().execute(query, values)
+        finally:
+            await self._observe("execute", inicio, query, values)
+
+    async def execute_many(self, query, values):
+        inicio = time.perf_counter()
+        try:
+            return await super().execute_many(query, values)
+        finally:
+            await self._observe("execute_many", inicio, query, values)
+
+    async def fetch_all(self, query, values=None):
+        inicio = time.perf_counter()
+        try:
+            return await super().fetch_all(query, values)
+        finally:
+            await self._observe("fetch_all", inicio, query, values)
+
+    async def fetch_one(self, query, values=None):
+        inicio = time.perf_counter()
+        try:
+            return await super().fetch_one(query, values)
+        finally:
+            await self._observe("fetch_one", inicio, query, values)
+
+    async def fetch_val(self, query, values=None, column=0):
+        inicio = time.perf_counter()
+        try:
+            return await super().fetch_val(query, values, column=column)
+        finally:
+            await self._observe("fetch_val", inicio, query, values)
+
+
+class SQLitePool:
+    """Pool de conexões aiosqlite persistentes, com PRAGMAs aplicados na abertura.
+
+    Substitui o pool do backend SQLite do ``databases``, que abre uma conexão
+    nova a cada uso.
+    """
+
+    def __init__(self, database: str, size: int, pragmas: dict[str, Any]):
+        self._database = database
+        self._pragmas = pragmas
+        self._idle: list[aiosqlite.Connection] = []
+        self._connections: list[aiosqlite.Connection] = []
+        self._available = asyncio.Semaphore(size)
+        # Atributo consultado por SQLiteBackend.disconnect
+        self._memref = None
+
+    async def acquire(self) -> aiosqlite.Connection:
+        await self._available.acquire()
+        try:
+            if self._idle:
+                return self._idle.pop()
+            connection = await aiosqlite.connect(database=self._database, isolation_level=None)
+            self._connections.append(connection)
+            await connection.executescript("".join(f"PRAGMA {name} = {value};" for name, value in self._pragmas.items()))
+            return connection
+        except BaseException:
+            self._available.release()
+            raise
+
+    async def release(self, connection: aiosqlite.Connection) -> None:
+        self._idle.append(connection)
+        self._available.release()
+
+    async def close(self) -> None:
+        self._idle.clear()
+        while self._connections:
+            await self._connections.pop().close()
+
 
-database = Database(settings.database_url)
+def _sqlite_pragmas(read_only: bool) -> dict[str, Any]:
+    pragmas = {} if read_only else {"journal_mode": settings.sqlite_journal_mode}
+    pragmas.update(
+        busy_timeout=settings.sqlite_busy_timeout_ms,
+        synchronous=settings.sqlite_synchronous,
+        cache_size=settings.sqlite_cache_size,
+        mmap_size=settings.sqlite_mmap_size,
+    )
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def _uses_pool(db: Database) -> bool:
+    return isinstance(getattr(db._backend, "_pool", None), SQLitePool)
+
+
+def _create_database(pool_size: int, read_only: bool = False) -> Database:
+    db = InstrumentedDatabase(settings.database_url)
+    if db.url.dialect == "sqlite" and db.url.database != ":memory:" and not db.url.options:
+        db._backend._pool = SQLitePool(db.url.database, size=pool_size, pragmas=_sqlite_pragmas(read_only))
+    return db
+
+
+# Escritas passam por uma única conexão; leituras usam um pool separado,
+# que em WAL não espera pelas escritas em andamento
+database = _create_database(pool_size=1)
+read_database = (
+    _create_database(pool_size=settings.sqlite_read_pool_size, read_only=True)
+    if _uses_pool(database) and settings.sqlite_read_pool_size > 0
+    else database
+)
 metadata = MetaData()
-engine = create_engine(
-    settings.database_url.replace("+aiosqlite", ""),
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+write_batcher = WriteBatcher(
+    database,
+    window_ms=settings.write_batch_window_ms,
+    max_size=settings.write_batch_max_size,
 )
 
 
+def create_sync_engine() -> Engine:
+    """Engine síncrono para DDL e migrations; o processo que atende requisições usa só os ``Database``"""
+    return create_engine(
+        settings.database_url.replace("+aiosqlite", ""),
+        connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+    )
+
+
 async def connect_db():
     await database.connect()
+    if read_database is not database:
+        await read_database.connect()
+    if settings.write_batch_enabled:
+        await write_batcher.start()
 
 
 async def disconnect_db():
-    await database.disconnect()
+    await write_batcher.stop()
+    for db in [database] if read_database is database else [database, read_database]:
+        await db.disconnect()
+        if _uses_pool(db):
+            await db._backend._pool.close()
+
+
+def _sqlite_ocupado(exc: sqlite3.OperationalError) -> bool:
+    mensagem = str(exc)
+    return "database is locked" in mensagem or "database is busy" in mensagem or "database table is locked" in mensagem
+
+
+async def retry_on_busy(operation: Callable[[], Awaitable[Any]]) -> Any:
+    """Executa a operação e a repete enquanto o SQLite responder que está ocupado.
+
+    A operação deve conter a transação inteira, para ser repetida do início.
+    Esgotadas as ``write_retry_attempts`` novas tentativas, responde 503.
+    """
+    for tentativa in range(settings.write_retry_attempts + 1):
+        try:
+            return await operation()
+        except sqlite3.OperationalError as exc:
+            if not _sqlite_ocupado(exc):
+                raise
+            if tentativa == settings.write_retry_attempts:
+                metrics.increment("db_busy_failures_total")
+                raise DatabaseBusyError from exc
+        metrics.increment("db_busy_retries_total")
+        # Jitter completo: escritores que falharam juntos não tentam de novo juntos
+        await asyncio.sleep(random.uniform(0, settings.write_retry_base_delay_ms * 2**tentativa) / 1000)
+
+
+async def run_in_transaction(operation: Callable[[], Awaitable[Any]]) -> Any:
+    """Executa uma operação de escrita em uma transação.
+
+    Com o group commit habilitado, a operação é enviada ao ``write_batcher`` e
+    confirmada junto com as demais escritas concorrentes. Se o banco estiver
+    ocupado, a transação é repetida por ``retry_on_busy``.
+    """
+    if write_batcher.running:
+        return await retry_on_busy(lambda: write_batcher.submit(operation))
+
+    async def executar():
+        async with database.transaction():
+            return await operation()
 
+    return await retry_on_busy(executar)
@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+
+from src.config import settings
+from src.metrics import metrics
+
+
+class Assinatura:
+    """Fila limitada de eventos de um assinante.
+
+    Quando o assinante não acompanha o ritmo, o evento mais antigo é descartado
+    e contado em ``perdidos``; como cada evento traz o saldo resultante, o mais
+    recente continua suficiente para atualizar o cliente.
+    """
+
+    def __init__(self, maxsize: int):
+        self._fila: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.perdidos = 0
+
+    def entregar(self, evento) -> None:
+        if self._fila.full():
+            self._fila.get_nowait()
+            self.perdidos += 1
+            metrics.increment("eventos_descartados_total")
+        self._fila.put_nowait(evento)
+
+    async def get(self):
+        return await self._fila.get()
+
+
+class EventBroker:
+    """Pub/sub em memória do processo, com uma ``Assinatura`` por ouvinte e tópico.
+
+    Publicar é síncrono e não bloqueia: o evento é só colocado nas filas dos
+    assinantes do tópico. Ouvintes ociosos custam uma fila vazia, sem consultas
+    ao banco.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._assinaturas: dict[Hashable, set[Assinatura]] = {}
+        self._total = 0
+
+    def assinantes(self, topico: Hashable) -> int:
+        return len(self._assinaturas.get(topico, ()))
+
+    def publish(self, topico: Hashable, evento) -> None:
+        for assinatura in self._assinaturas.get(topico, ()):
+            assinatura.entregar(evento)
+
+    @contextmanager
+    def subscribe(self, topico: Hashable) -> Iterator[Assinatura]:
+        assinatura = Assinatura(self.queue_size)
+        self._assinaturas.setdefault(topico, set()).add(assinatura)
+        self._total += 1
+        metrics.set_gauge("eventos_assinantes", self._total)
+        try:
+            yield assinatura
+        finally:
+            self._total -= 1
+            metrics.set_gauge("eventos_assinantes", self._total)
+            assinaturas = self._assinaturas[topico]
+            assinaturas.discard(assinatura)
+            if not assinaturas:
+                del self._assinaturas[topico]
+
+
+# Tópicos são IDs de conta; eventos são JSON já serializado, uma vez por publicação
+broker = EventBroker(queue_size=settings.eventos_queue_size)
@@ -29,6 +29,30 @@ class InsufficientBalanceError(HTTPException):
         )
 
 
+class DuplicateContaError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe uma conta com este número",
+        )
+
+
+class IdempotencyKeyConflictError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency-Key em uso por outra requisição; tente novamente",
+        )
+
+
+class IdempotencyKeyMismatchError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key já usada em uma requisição diferente",
+        )
+
+
 class InvalidAmountError(HTTPException):
     def __init__(self, detail: str = "Valor inválido"):
         super().__init__(
@@ -36,3 +60,27 @@ class InvalidAmountError(HTTPException):
             detail=detail,
         )
 
+
+class InvalidCursorError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido",
+        )
+
+
+class InvalidPeriodError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Período inválido: a data inicial deve ser anterior ou igual à final",
+        )
+
+
+class DatabaseBusyError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Banco de dados ocupado; tente novamente",
+            headers={"Retry-After": "1"},
+        )
@@ -0,0 +1,27 @@
+"""
+Job de arquivamento de transações
+
+Move as transações mais antigas que ARQUIVO_HORIZONTE_DIAS de transacoes para
+transacoes_arquivo, em lotes de ARQUIVO_LOTE. Pode ser interrompido e repetido.
+Execute a partir da raiz do projeto, por exemplo uma vez por dia:
+
+    python -m src.jobs.arquivo
+"""
+import asyncio
+
+from src.config import settings
+from src.database import connect_db, disconnect_db
+from src.services.arquivo import ArquivoService
+
+
+async def main() -> None:
+    await connect_db()
+    try:
+        total = await ArquivoService().arquivar(settings.arquivo_horizonte_dias, settings.arquivo_lote)
+        print(f"{total} transação(ões) arquivada(s)")
+    finally:
+        await disconnect_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+"""
+Job de limpeza das respostas de Idempotency-Key
+
+Remove as respostas mais antigas que IDEMPOTENCY_TTL_SECONDS. Execute a partir
+da raiz do projeto, por exemplo a cada hora:
+
+    python -m src.jobs.idempotencia
+"""
+import asyncio
+
+from src.database import connect_db, disconnect_db
+from src.services.idempotencia import IdempotenciaService
+
+
+async def main() -> None:
+    await connect_db()
+    try:
+        total = await IdempotenciaService().purge()
+        print(f"{total} resposta(s) expirada(s) removida(s)")
+    finally:
+        await disconnect_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,21 @@
+"""
+Job de inicialização do schema
+
+Cria as tabelas que ainda não existem. Execute uma vez a partir da raiz do
+projeto antes de subir os workers, com SCHEMA_INIT_ON_STARTUP=false nos workers:
+
+    python -m src.jobs.schema
+"""
+import time
+
+from src.schema import init_schema
+
+
+def main() -> None:
+    inicio = time.perf_counter()
+    init_schema()
+    print(f"Schema verificado em {time.perf_counter() - inicio:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
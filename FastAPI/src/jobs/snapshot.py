@@ -0,0 +1,26 @@
+"""
+Job de snapshots diários de saldo
+
+Atualiza a tabela saldos_snapshot apenas para as contas com transações desde a
+última execução. Execute a partir da raiz do projeto, por exemplo uma vez por
+dia após a meia-noite UTC:
+
+    python -m src.jobs.snapshot
+"""
+import asyncio
+
+from src.database import connect_db, disconnect_db
+from src.services.saldo import SaldoService
+
+
+async def main() -> None:
+    await connect_db()
+    try:
+        total = await SaldoService().gerar_snapshots()
+        print(f"Snapshots atualizados para {total} conta(s)")
+    finally:
+        await disconnect_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from typing import AsyncIterator, Hashable
+
+from src.config import settings
+from src.database import write_batcher
+from src.metrics import metrics
+
+
+class StripedLock:
+    """Locks por chave com memória fixa: cada chave usa um de ``stripes`` locks.
+
+    Chaves diferentes podem cair na mesma listra e esperar uma pela outra, mas
+    uma conta muito disputada bloqueia só as contas da sua listra.
+    """
+
+    def __init__(self, stripes: int, name: str):
+        self._locks = [asyncio.Lock() for _ in range(max(stripes, 1))]
+        self.name = name
+
+    def _listras(self, chaves: tuple[Hashable, ...]) -> list[int]:
+        # Ordem crescente de listra: quem trava várias chaves nunca espera em ciclo
+        return sorted({hash(chave) % len(self._locks) for chave in chaves})
+
+    @asynccontextmanager
+    async def hold(self, *chaves: Hashable) -> AsyncIterator[None]:
+        """Mantém travadas as listras das chaves enquanto o bloco executa"""
+        travados: list[asyncio.Lock] = []
+        inicio = time.perf_counter()
+        disputado = False
+        try:
+            for listra in self._listras(chaves):
+                lock = self._locks[listra]
+                disputado = disputado or lock.locked()
+                await lock.acquire()
+                travados.append(lock)
+            if disputado:
+                labels = f'lock="{self.name}"'
+                metrics.increment("lock_contended_total", labels=labels)
+                metrics.increment("lock_wait_seconds_total", time.perf_counter() - inicio, labels=labels)
+            yield
+        finally:
+            for lock in reversed(travados):
+                lock.release()
+
+
+conta_locks = StripedLock(settings.conta_lock_stripes, name="conta")
+
+
+def travar_contas(*conta_ids: int) -> AbstractAsyncContextManager:
+    """Serializa no processo os lançamentos das contas enquanto o bloco executa.
+
+    Com o group commit ativo, as operações de um lote já executam em sequência,
+    e manter o lock durante a espera pelo lote limitaria a conta a um
+    lançamento por lote; nesse caso o lock é dispensado.
+    """
+    if write_batcher.running:
+        return nullcontext()
+    return conta_locks.hold(*conta_ids)
@@ -1,20 +1,38 @@
-from contextlib import asynccontextmanager
+import time
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+_inicio_importacao = time.perf_counter()
 
-from src.controllers import auth, conta, transacao
-from src.database import connect_db, disconnect_db, engine, metadata
-from src.models import conta as conta_model, transacao as transacao_model
+import asyncio  # noqa: E402
+import logging  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+
+from src.config import settings  # noqa: E402
+from src.controllers import auth, conta, metrics, post, transacao, transferencia  # noqa: E402
+from src.database import connect_db, disconnect_db  # noqa: E402
+from src.metrics import MetricsMiddleware, metrics as app_metrics  # noqa: E402
+from src.schema import init_schema  # noqa: E402
+
+# Logger do uvicorn, para os tempos de inicialização aparecerem no log do servidor
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
+    inicio = time.perf_counter()
     # Conecta ao banco de dados na inicialização
     await connect_db()
-    # Cria as tabelas se não existirem
-    metadata.create_all(bind=engine)
+    # Cria as tabelas se não existirem, sem bloquear o event loop
+    if settings.schema_init_on_startup:
+        await asyncio.to_thread(init_schema)
+    # Gera o openapi.json agora, e não na primeira requisição a /docs
+    app.openapi()
+    duracao = time.perf_counter() - inicio
+    app_metrics.set_gauge("app_startup_seconds", duracao)
+    logger.info("Importação em %.3fs, inicialização em %.3fs", _duracao_importacao, duracao)
     yield
     # Desconecta do banco de dados no encerramento
     await disconnect_db()
@@ -37,10 +55,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latência por rota e consultas ao banco por requisição, expostas em /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Inclui as rotas
 app.include_router(auth.router)
 app.include_router(conta.router)
 app.include_router(transacao.router)
+app.include_router(transferencia.router)
+app.include_router(post.router)
+app.include_router(metrics.router)
 
 
 @app.get("/", tags=["Raiz"])
@@ -51,3 +75,7 @@ async def root():
         "docs": "/docs",
         "version": "1.0.0",
     }
+
+
+_duracao_importacao = time.perf_counter() - _inicio_importacao
+app_metrics.set_gauge("app_import_seconds", _duracao_importacao)
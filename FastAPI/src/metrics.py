@@ -0,0 +1,183 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Consultas e tempo de banco acumulados pela requisição em andamento: [consultas, segundos]
+_request_db: ContextVar[list | None] = ContextVar("request_db", default=None)
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        separator = "," if labels else ""
+        lines = []
+        acumulado = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            acumulado += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bucket}"}} {acumulado}')
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class Metrics:
+    """Métricas do processo: requisições por rota e consultas ao banco"""
+
+    def __init__(self):
+        self.request_latency: dict[tuple[str, str], Histogram] = {}
+        self.request_db_time: dict[tuple[str, str], Histogram] = {}
+        self.request_db_queries: dict[tuple[str, str], Histogram] = {}
+        self.request_status: dict[tuple[str, str, int], int] = {}
+        self.query_latency: dict[str, Histogram] = {}
+        self.counters: dict[tuple[str, str], float] = {}
+        self.gauges: dict[tuple[str, str], float] = {}
+        self.caches: dict[str, object] = {}
+
+    def observe_request(self, method: str, route: str, status: int, duration: float, db: list) -> None:
+        key = (method, route)
+        histogram = self.request_latency.get(key)
+        if histogram is None:
+            histogram = self.request_latency[key] = Histogram(LATENCY_BUCKETS)
+            self.request_db_time[key] = Histogram(LATENCY_BUCKETS)
+            self.request_db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+        histogram.observe(duration)
+        self.request_db_queries[key].observe(db[0])
+        self.request_db_time[key].observe(db[1])
+        status_key = (method, route, status)
+        self.request_status[status_key] = self.request_status.get(status_key, 0) + 1
+
+    def observe_query(self, operation: str, duration: float) -> None:
+        histogram = self.query_latency.get(operation)
+        if histogram is None:
+            histogram = self.query_latency[operation] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(duration)
+        db = _request_db.get()
+        if db is not None:
+            db[0] += 1
+            db[1] += duration
+
+    def increment(self, name: str, value: float = 1, labels: str = "") -> None:
+        """Incrementa um contador livre, exposto como ``name{labels}``"""
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: str = "") -> None:
+        """Define o valor de um medidor livre, exposto como ``name{labels}``"""
+        self.gauges[(name, labels)] = value
+
+    def register_cache(self, name: str, cache) -> None:
+        """Expõe os contadores de um cache com método ``stats()``"""
+        self.caches[name] = cache
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Latência das requisições HTTP por rota",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.request_latency.items()):
+            lines += histogram.render("http_request_duration_seconds", f'method="{method}",route="{route}"')
+
+        lines += ["# HELP http_requests_total Requisições HTTP por rota e status", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(self.request_status.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_db_queries Consultas ao banco por requisição",
+            "# TYPE http_request_db_queries histogram",
+        ]
+        for (method, route), histogram in sorted(self.request_db_queries.items()):
+            lines += histogram.render("http_request_db_queries", f'method="{method}",route="{route}"')
+
+        lines += [
+            "# HELP http_request_db_duration_seconds Tempo total de banco por requisição",
+            "# TYPE http_request_db_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.request_db_time.items()):
+            lines += histogram.render("http_request_db_duration_seconds", f'method="{method}",route="{route}"')
+
+        lines += [
+            "# HELP db_query_duration_seconds Latência das consultas ao banco por operação",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        for operation, histogram in sorted(self.query_latency.items()):
+            lines += histogram.render("db_query_duration_seconds", f'operation="{operation}"')
+
+        if self.caches:
+            lines += ["# HELP cache_hits_total Acertos de cache", "# TYPE cache_hits_total counter"]
+            lines += [f'cache_hits_total{{cache="{name}"}} {cache.stats()["hits"]}' for name, cache in self.caches.items()]
+            lines += ["# HELP cache_misses_total Faltas de cache", "# TYPE cache_misses_total counter"]
+            lines += [
+                f'cache_misses_total{{cache="{name}"}} {cache.stats()["misses"]}' for name, cache in self.caches.items()
+            ]
+            lines += ["# HELP cache_size Itens em cache", "# TYPE cache_size gauge"]
+            lines += [f'cache_size{{cache="{name}"}} {cache.stats()["size"]}' for name, cache in self.caches.items()]
+
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (counter, labels), value in sorted(self.counters.items()):
+                if counter == name:
+                    lines.append(f"{name}{{{labels}}} {value}")
+
+        for name in sorted({name for name, _ in self.gauges}):
+            lines.append(f"# TYPE {name} gauge")
+            for (gauge, labels), value in sorted(self.gauges.items()):
+                if gauge == name:
+                    lines.append(f"{name}{{{labels}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP pelo template da rota"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        inicio = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _request_db.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], route.path if route is not None else "nao_encontrada", status, duracao, db
+            )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, Table
+
+from src.database import metadata
+
+# Posição de retomada dos jobs em lote (ex.: último ID de transação processado)
+checkpoints = Table(
+    "checkpoints",
+    metadata,
+    Column("nome", String(50), primary_key=True),
+    Column("posicao", Integer, nullable=False),
+)
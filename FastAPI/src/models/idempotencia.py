@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer, String, Table, Text
+from sqlalchemy.sql import func
+
+from src.database import metadata
+
+# Respostas de criação de transações por (usuário, Idempotency-Key)
+idempotencias = Table(
+    "idempotencias",
+    metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("chave", String(255), primary_key=True),
+    Column("resposta", Text, nullable=False),  # TransacaoOut serializado em JSON
+    Column("impressao", String(64), nullable=False, server_default=""),  # SHA-256 da conta e do corpo da requisição
+    Column("created_at", DateTime(timezone=True), server_default=func.now(), index=True),
+)
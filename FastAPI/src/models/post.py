@@ -0,0 +1,47 @@
+from sqlalchemy import DDL, Boolean, Column, DateTime, Index, Integer, String, Table, Text, column, event, table
+
+from src.database import metadata
+
+posts = Table(
+    "posts",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("title", String(150), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("published_at", DateTime(timezone=True), nullable=True),
+    Column("published", Boolean, nullable=False, default=False),
+    # Listagem paginada por (published_at, id): cada página é uma varredura de faixa no índice
+    Index("ix_posts_published_published_at_id", "published", "published_at", "id"),
+)
+
+# Índice FTS5 de conteúdo externo: guarda só o índice invertido e lê o texto de posts
+posts_fts = table("posts_fts", column("rowid"))
+
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, content, content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Triggers mantêm o índice sincronizado em create/update/delete
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+for _statement in _FTS_DDL:
+    event.listen(posts, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(posts, "before_drop", DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, Table
+
+from src.database import metadata
+
+# Saldo e totais de cada conta ao fim de um dia (UTC) com movimentação,
+# mantidos incrementalmente pelo job de snapshots
+saldos_snapshot = Table(
+    "saldos_snapshot",
+    metadata,
+    Column("conta_id", Integer, ForeignKey("contas.id"), primary_key=True),
+    Column("dia", Date, primary_key=True),
+    Column("saldo", Float, nullable=False),
+    Column("total_depositos", Float, nullable=False, default=0.0),
+    Column("total_saques", Float, nullable=False, default=0.0),
+    Column("quantidade", Integer, nullable=False, default=0),
+    Column("ultima_transacao_id", Integer, nullable=False),
+)
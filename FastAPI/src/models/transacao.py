@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.sql import func
 
 from src.database import metadata
@@ -12,5 +12,11 @@ transacoes = Table(
     Column("valor", Float, nullable=False),
     Column("descricao", String(255)),
     Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    # Extrato paginado por (created_at, id): cada página é uma varredura de faixa no índice
+    Index("ix_transacoes_conta_id_created_at_id", "conta_id", "created_at", "id"),
+    # Exportação por período: acha a faixa de IDs das datas sem varrer a tabela
+    Index("ix_transacoes_created_at", "created_at"),
+    # AUTOINCREMENT: IDs nunca são reutilizados, nem depois que o arquivamento move as transações mais novas
+    sqlite_autoincrement=True,
 )
 
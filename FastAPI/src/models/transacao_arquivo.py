@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Table
+
+from src.database import metadata
+
+# Transações antigas movidas de transacoes pelo job de arquivamento, com os mesmos IDs;
+# mantém a tabela quente e seus índices pequenos
+transacoes_arquivo = Table(
+    "transacoes_arquivo",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("conta_id", Integer, ForeignKey("contas.id"), nullable=False),
+    Column("tipo", String(10), nullable=False),
+    Column("valor", Float, nullable=False),
+    Column("descricao", String(255)),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Index("ix_transacoes_arquivo_conta_id_created_at_id", "conta_id", "created_at", "id"),
+    Index("ix_transacoes_arquivo_created_at", "created_at"),
+)
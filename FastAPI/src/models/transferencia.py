@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Table
+from sqlalchemy.sql import func
+
+from src.database import metadata
+
+# Transferência entre contas: liga a perna de débito (saque na origem) à de crédito (depósito no destino)
+transferencias = Table(
+    "transferencias",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("conta_origem_id", Integer, ForeignKey("contas.id"), nullable=False, index=True),
+    Column("conta_destino_id", Integer, ForeignKey("contas.id"), nullable=False, index=True),
+    Column("valor", Float, nullable=False),
+    Column("descricao", String(255)),
+    # Sem chave estrangeira: as pernas podem estar em transacoes ou, depois de arquivadas, em transacoes_arquivo
+    Column("transacao_debito_id", Integer, nullable=False, unique=True),
+    Column("transacao_credito_id", Integer, nullable=False, unique=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
@@ -0,0 +1,42 @@
+import base64
+import binascii
+from datetime import datetime
+
+from src.exceptions import InvalidCursorError
+
+
+def encode_cursor(last_id: int) -> str:
+    """Gera um cursor opaco a partir do ID do último registro da página"""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Recupera o ID do último registro a partir de um cursor opaco"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        last_id = int(base64.urlsafe_b64decode(cursor + padding).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError
+    if last_id <= 0:
+        raise InvalidCursorError
+    return last_id
+
+
+def encode_keyset_cursor(valor: datetime | None, last_id: int) -> str:
+    """Gera um cursor opaco a partir da chave de ordenação (data, ID) do último registro da página"""
+    chave = f"{valor.isoformat() if valor is not None else ''}|{last_id}"
+    return base64.urlsafe_b64encode(chave.encode()).decode().rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[datetime | None, int]:
+    """Recupera a chave de ordenação (data, ID) do último registro a partir de um cursor opaco"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        valor, last_id = base64.urlsafe_b64decode(cursor + padding).decode().split("|")
+        last_id = int(last_id)
+        valor = datetime.fromisoformat(valor) if valor else None
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError
+    if last_id <= 0:
+        raise InvalidCursorError
+    return valor, last_id
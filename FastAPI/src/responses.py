@@ -0,0 +1,117 @@
+import gzip
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel, TypeAdapter
+
+from src.config import settings
+
+try:
+    import msgpack
+except ImportError:  # dependência opcional: sem ela, as respostas são sempre JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def as_dicts(rows: list) -> list[dict[str, Any]]:
+    """Converte registros do banco em dicts pela posição das colunas, evitando o
+    acesso por nome de cada campo, que é lento em listas grandes"""
+    if not rows:
+        return []
+    campos = rows[0]._fields
+    return [dict(zip(campos, row)) for row in rows]
+
+
+@lru_cache(maxsize=256)
+def _pesos(header: str) -> dict[str, float]:
+    """Valores de um header ``Accept*`` e seus pesos ``q``"""
+    pesos = {}
+    for parte in header.split(","):
+        valor, *parametros = parte.split(";")
+        peso = 1.0
+        for parametro in parametros:
+            nome, _, numero = parametro.strip().partition("=")
+            if nome == "q":
+                try:
+                    peso = float(numero)
+                except ValueError:
+                    peso = 0.0
+        if valor.strip():
+            pesos[valor.strip().lower()] = peso
+    return pesos
+
+
+def prefere_msgpack(accept: str | None) -> bool:
+    """Se o cliente pediu MessagePack com peso ao menos igual ao de JSON; ``*/*`` continua em JSON"""
+    if msgpack is None or not accept:
+        return False
+    pesos = _pesos(accept)
+    peso = max(pesos.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    return peso > 0 and peso >= pesos.get("application/json", 0.0)
+
+
+def aceita_gzip(accept_encoding: str | None) -> bool:
+    return bool(accept_encoding) and _pesos(accept_encoding).get("gzip", 0.0) > 0
+
+
+def model_response(
+    model: type[BaseModel],
+    data: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: dict[str, str] | None = None,
+    request: Request | None = None,
+) -> Response:
+    """Valida ``data`` contra ``model`` e serializa direto para bytes JSON.
+
+    Os validadores e serializadores compilados do Pydantic são usados uma única
+    vez; devolver um ``Response`` faz o FastAPI pular a revalidação pelo
+    ``response_model``, que continua documentando o contrato no OpenAPI.
+
+    Com ``request``, o formato é negociado: ``Accept: application/msgpack``
+    recebe MessagePack, e JSON a partir de ``gzip_min_size`` bytes é
+    comprimido quando o cliente aceita gzip.
+    """
+    adapter = _adapter(model)
+    valor = adapter.validate_python(data)
+    if request is None:
+        conteudo = adapter.dump_json(valor)
+        return Response(conteudo, status_code=status_code, headers=headers, media_type="application/json")
+
+    headers = {**(headers or {}), "Vary": "Accept, Accept-Encoding"}
+    if prefere_msgpack(request.headers.get("accept")):
+        # Mesmos valores do JSON (datas em ISO 8601, enums pelo valor), com floats em binário
+        conteudo = msgpack.packb(adapter.dump_python(valor, mode="json"))
+        return Response(conteudo, status_code=status_code, headers=headers, media_type=MSGPACK_MEDIA_TYPES[0])
+
+    conteudo = adapter.dump_json(valor)
+    if len(conteudo) >= settings.gzip_min_size and aceita_gzip(request.headers.get("accept-encoding")):
+        conteudo = gzip.compress(conteudo, compresslevel=settings.gzip_compresslevel, mtime=0)
+        headers["Content-Encoding"] = "gzip"
+    return Response(conteudo, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def make_etag(*partes: Any) -> str:
+    """ETag fraca a partir das partes que identificam a versão do recurso"""
+    return 'W/"{}"'.format("-".join(str(parte) for parte in partes))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Compara o header ``If-None-Match`` com a ETag atual, com comparação fraca"""
+    if not if_none_match:
+        return False
+    atual = etag.removeprefix("W/")
+    return any(
+        candidata == "*" or candidata.removeprefix("W/") == atual
+        for candidata in (parte.strip() for parte in if_none_match.split(","))
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,123 @@
+from sqlalchemy import Table, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src.database import create_sync_engine, metadata
+from src.models import (  # noqa: F401 - registram as tabelas em metadata
+    checkpoint,
+    conta,
+    idempotencia,
+    post,
+    saldo_snapshot,
+    transacao,
+    transacao_arquivo,
+    transferencia,
+)
+from src.models.idempotencia import idempotencias
+from src.models.transacao import transacoes
+from src.models.transferencia import transferencias
+
+
+def init_schema() -> None:
+    """Cria as tabelas (e índices/triggers associados) que ainda não existem.
+
+    Usa um engine síncrono descartado ao final; rode uma vez antes de subir os
+    workers (``python -m src.jobs.schema``) ou, em desenvolvimento, na
+    inicialização via ``asyncio.to_thread``.
+    """
+    engine = create_sync_engine()
+    try:
+        metadata.create_all(bind=engine)
+        _migrar_idempotencias_impressao(engine)
+        if engine.dialect.name == "sqlite":
+            _migrar_transacoes_autoincrement(engine)
+            _migrar_transferencias_sem_fk(engine)
+    finally:
+        engine.dispose()
+
+
+def _migrar_idempotencias_impressao(engine: Engine) -> None:
+    """Adiciona a coluna ``impressao`` em bancos criados antes dela.
+
+    Respostas já registradas ficam com impressão vazia e recusam repetições
+    até expirarem, em vez de serem devolvidas a requisições diferentes.
+    """
+    if "impressao" in {coluna["name"] for coluna in inspect(engine).get_columns("idempotencias")}:
+        return
+    coluna = idempotencias.c.impressao
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            f"ALTER TABLE idempotencias ADD COLUMN impressao {coluna.type.compile(engine.dialect)} NOT NULL DEFAULT ''"
+        )
+
+
+def _migrar_transacoes_autoincrement(engine: Engine) -> None:
+    """Recria ``transacoes`` com AUTOINCREMENT em bancos criados antes da opção.
+
+    Sem ela, o SQLite reutiliza os IDs das transações mais novas depois que são
+    arquivadas. A sequência parte do maior ID entre transacoes e transacoes_arquivo.
+    """
+    ddl = _ddl(engine, "transacoes")
+    if ddl is None or "AUTOINCREMENT" in ddl.upper():
+        return
+    _recriar_tabela(
+        engine,
+        transacoes,
+        "DELETE FROM sqlite_sequence WHERE name = 'transacoes'",
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'transacoes', max("
+        "(SELECT coalesce(max(id), 0) FROM transacoes), (SELECT coalesce(max(id), 0) FROM transacoes_arquivo))",
+    )
+
+
+def _migrar_transferencias_sem_fk(engine: Engine) -> None:
+    """Recria ``transferencias`` sem as chaves estrangeiras para ``transacoes``.
+
+    As pernas de uma transferência podem ser movidas para transacoes_arquivo, e
+    as chaves deixariam referências pendentes (e recusariam o arquivamento com
+    ``PRAGMA foreign_keys = ON``).
+    """
+    ddl = _ddl(engine, "transferencias")
+    if ddl is None or "REFERENCES transacoes " not in ddl:
+        return
+    _recriar_tabela(engine, transferencias)
+
+
+def _ddl(engine: Engine, tabela: str) -> str | None:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)
+        ).scalar()
+
+
+def _recriar_tabela(engine: Engine, tabela: Table, *depois: str) -> None:
+    """Recria a tabela a partir do modelo e copia as linhas, em uma única transação.
+
+    ``depois`` são comandos executados na mesma transação, após a cópia.
+    """
+    with engine.connect() as connection:
+        indices = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (tabela.name,),
+        ).scalars().all()
+
+    antiga = f"{tabela.name}_antiga"
+    colunas = ", ".join(column.name for column in tabela.c)
+    comandos = [
+        # Sem o modo legado, o RENAME reescreveria as chaves estrangeiras das outras tabelas para a antiga
+        "PRAGMA legacy_alter_table = ON",
+        "BEGIN",
+        f"ALTER TABLE {tabela.name} RENAME TO {antiga}",
+        *(f"DROP INDEX {indice}" for indice in indices),
+        str(CreateTable(tabela).compile(engine)),
+        *(str(CreateIndex(indice).compile(engine)) for indice in tabela.indexes),
+        f"INSERT INTO {tabela.name} ({colunas}) SELECT {colunas} FROM {antiga}",
+        f"DROP TABLE {antiga}",
+        *depois,
+        "COMMIT",
+        "PRAGMA legacy_alter_table = OFF",
+    ]
+    conexao = engine.raw_connection()
+    try:
+        conexao.driver_connection.executescript(";\n".join(comandos) + ";")
+    finally:
+        conexao.close()
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -17,3 +19,29 @@ class ContaOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+class LoteContasIn(BaseModel):
+    """Schema para requisição de importação de contas em lote"""
+    contas: list[ContaIn] = Field(..., min_length=1, max_length=50000, description="Contas a criar")
+
+
+class ResultadoContaLoteOut(BaseModel):
+    """Schema para o resultado de um item da importação"""
+    indice: int
+    numero: str
+    id: int | None = Field(None, description="ID da conta criada")
+    erro: str | None = Field(None, description="Motivo da recusa do item")
+
+
+class LoteContasOut(BaseModel):
+    """Schema para resposta de importação de contas em lote"""
+    resultados: list[ResultadoContaLoteOut]
+    total_criadas: int
+    total_recusadas: int
+
+
+class SaldoOut(BaseModel):
+    """Schema para resposta de saldo em um instante"""
+    conta_id: int
+    em: datetime
+    saldo: float
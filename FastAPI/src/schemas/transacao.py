@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 from pydantic import BaseModel, Field, field_validator
@@ -10,6 +10,19 @@ class TipoTransacao(str, Enum):
     SAQUE = "saque"
 
 
+class Granularidade(str, Enum):
+    """Enum para o tamanho dos períodos do resumo"""
+    DIA = "dia"
+    SEMANA = "semana"
+    MES = "mes"
+
+
+class FormatoExportacao(str, Enum):
+    """Enum para os formatos da exportação de transações"""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 class TransacaoIn(BaseModel):
     """Schema para criação de transação"""
     tipo: TipoTransacao = Field(..., description="Tipo da transação: 'deposito' ou 'saque'")
@@ -37,6 +50,33 @@ class TransacaoOut(BaseModel):
         from_attributes = True
 
 
+class TransacaoLoteIn(TransacaoIn):
+    """Schema para item de um lote de transações"""
+    conta_id: int = Field(..., gt=0, description="ID da conta corrente da transação")
+
+
+class LoteTransacoesIn(BaseModel):
+    """Schema para requisição de lote de transações"""
+    transacoes: list[TransacaoLoteIn] = Field(
+        ..., min_length=1, max_length=10000, description="Transações aplicadas na ordem em que aparecem"
+    )
+
+
+class ResultadoLoteOut(BaseModel):
+    """Schema para o resultado de um item do lote"""
+    indice: int
+    conta_id: int
+    id: int | None = Field(None, description="ID da transação criada")
+    erro: str | None = Field(None, description="Motivo da recusa do item")
+
+
+class LoteTransacoesOut(BaseModel):
+    """Schema para resposta de lote de transações"""
+    resultados: list[ResultadoLoteOut]
+    total_criadas: int
+    total_recusadas: int
+
+
 class ContaExtrato(BaseModel):
     """Schema para conta no extrato"""
     id: int
@@ -44,9 +84,32 @@ class ContaExtrato(BaseModel):
     titular: str
 
 
+class EventoTransacaoOut(BaseModel):
+    """Schema para evento de transação confirmada no stream da conta"""
+    transacao: TransacaoOut
+    saldo: float = Field(..., description="Saldo da conta após a transação")
+
+
 class ExtratoOut(BaseModel):
     """Schema para resposta de extrato bancário"""
     conta: ContaExtrato
     transacoes: list[TransacaoOut]
     saldo_atual: float
+    proximo_cursor: str | None = Field(
+        None, description="Cursor para a próxima página do extrato; nulo quando não há mais transações"
+    )
 
+
+class ResumoPeriodoOut(BaseModel):
+    """Schema para os totais de um período do resumo"""
+    inicio: date = Field(..., description="Primeiro dia do período (semanas começam na segunda-feira)")
+    total_depositos: float
+    total_saques: float
+    quantidade: int
+
+
+class ResumoOut(BaseModel):
+    """Schema para resposta de resumo de transações"""
+    conta_id: int
+    granularidade: Granularidade
+    periodos: list[ResumoPeriodoOut]
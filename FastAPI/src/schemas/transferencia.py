@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field, model_validator
+
+from src.schemas.transacao import TransacaoOut
+
+
+class TransferenciaIn(BaseModel):
+    """Schema para criação de transferência entre contas"""
+    conta_origem_id: int = Field(..., gt=0, description="ID da conta debitada")
+    conta_destino_id: int = Field(..., gt=0, description="ID da conta creditada")
+    valor: float = Field(..., gt=0, description="Valor transferido (deve ser maior que zero)")
+    descricao: str | None = Field(None, description="Descrição opcional, gravada nas duas transações", max_length=255)
+
+    @model_validator(mode="after")
+    def validate_contas(self):
+        if self.conta_origem_id == self.conta_destino_id:
+            raise ValueError("As contas de origem e destino devem ser diferentes")
+        return self
+
+
+class TransferenciaOut(BaseModel):
+    """Schema para resposta de transferência"""
+    id: int
+    conta_origem_id: int
+    conta_destino_id: int
+    valor: float
+    descricao: str | None
+    created_at: datetime
+    debito: TransacaoOut = Field(..., description="Saque gravado na conta de origem")
+    credito: TransacaoOut = Field(..., description="Depósito gravado na conta de destino")
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -5,10 +6,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 
+from src.cache import LRUCache
 from src.config import settings
+from src.metrics import metrics
 
 security = HTTPBearer()
 
+# Tokens já verificados -> user_id; cada entrada expira junto com o claim `exp` do token
+token_cache = LRUCache(maxsize=settings.token_cache_size, clock=time.time)
+metrics.register_cache("token", token_cache)
+
 
 def sign_jwt(user_id: int) -> dict:
     payload = {
@@ -21,12 +28,20 @@ def sign_jwt(user_id: int) -> dict:
 
 
 def verify_jwt(token: str) -> Optional[int]:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload.get("user_id")
     except JWTError:
         return None
 
+    user_id = payload.get("user_id")
+    if user_id is not None and "exp" in payload:
+        token_cache.set(token, user_id, expires_at=float(payload["exp"]))
+    return user_id
+
 
 async def login_required(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Date, literal, select, union_all
+
+from src.database import database, read_database
+from src.models.checkpoint import checkpoints
+from src.models.transacao import transacoes
+from src.models.transacao_arquivo import transacoes_arquivo
+
+# Data de corte do arquivamento, gravada como ordinal da data: toda transação
+# arquivada tem created_at anterior a ela
+CHECKPOINT_ARQUIVO = "transacoes_arquivo"
+
+
+def todas_transacoes():
+    """transacoes e transacoes_arquivo como uma única fonte, com as colunas de transacoes.
+
+    O SQLite leva os filtros para dentro de cada lado do UNION ALL e usa os
+    índices das duas tabelas.
+    """
+    return union_all(select(transacoes), select(transacoes_arquivo)).subquery("todas_transacoes")
+
+
+def fonte_transacoes(corte: date | None, desde: date | None):
+    """Fonte para consultar transações a partir do dia ``desde`` (None: todo o histórico).
+
+    Só inclui o arquivo quando o período alcança datas anteriores ao corte.
+    """
+    if corte is not None and (desde is None or desde < corte):
+        return todas_transacoes()
+    return transacoes
+
+
+class ArquivoService:
+    async def get_corte(self) -> date | None:
+        """Data de corte do arquivamento; None enquanto nada foi arquivado"""
+        posicao = await read_database.fetch_val(
+            select(checkpoints.c.posicao).where(checkpoints.c.nome == CHECKPOINT_ARQUIVO)
+        )
+        return date.fromordinal(posicao) if posicao is not None else None
+
+    async def arquivar(self, horizonte_dias: int, lote: int, hoje: date | None = None) -> int:
+        """Move para transacoes_arquivo as transações anteriores ao horizonte, em lotes.
+
+        O novo corte é publicado antes de mover qualquer linha, para que as
+        consultas que alcançam essas datas já leiam as duas tabelas. Cada lote
+        move as transações mais antigas em uma transação própria, então uma
+        execução interrompida pode ser repetida. Retorna a quantidade movida.
+        """
+        corte = (hoje or datetime.now(timezone.utc).date()) - timedelta(days=horizonte_dias)
+        atual = await self.get_corte()
+        if atual is not None and atual >= corte:
+            # O corte nunca recua: aumentar o horizonte não traz transações de volta
+            corte = atual
+        else:
+            async with database.transaction():
+                await database.execute(checkpoints.delete().where(checkpoints.c.nome == CHECKPOINT_ARQUIVO))
+                await database.execute(checkpoints.insert().values(nome=CHECKPOINT_ARQUIVO, posicao=corte.toordinal()))
+
+        # Mais antigas primeiro: o que fica em transacoes é sempre mais novo que o arquivo
+        query = (
+            select(transacoes.c.id)
+            .where(transacoes.c.created_at < literal(corte, Date))
+            .order_by(transacoes.c.created_at, transacoes.c.id)
+            .limit(lote)
+        )
+        movidas = 0
+        while True:
+            async with database.transaction():
+                ids = [row.id for row in await database.fetch_all(query)]
+                if not ids:
+                    break
+                await database.execute(
+                    transacoes_arquivo.insert().from_select(
+                        [column.name for column in transacoes.c],
+                        select(transacoes).where(transacoes.c.id.in_(ids)),
+                    )
+                )
+                await database.execute(transacoes.delete().where(transacoes.c.id.in_(ids)))
+            movidas += len(ids)
+        return movidas
@@ -1,41 +1,158 @@
+import sqlite3
+
 from databases.interfaces import Record
 
-from src.database import database
-from src.exceptions import NotFoundContaError
+from sqlalchemy import func, select, text
+
+from src.cache import LRUCache
+from src.config import settings
+from src.database import database, read_database, retry_on_busy
+from src.exceptions import DuplicateContaError, NotFoundContaError
+from src.metrics import metrics
 from src.models.conta import contas
+from src.models.transacao import transacoes
+from src.models.transacao_arquivo import transacoes_arquivo
 from src.schemas.conta import ContaIn
 
+# Caches compartilhados por todas as instâncias de ContaService do processo
+conta_cache = LRUCache(maxsize=settings.conta_cache_size, ttl=settings.conta_cache_ttl_seconds)
+numero_cache = LRUCache(maxsize=settings.conta_cache_size)
+metrics.register_cache("conta", conta_cache)
+metrics.register_cache("conta_numero", numero_cache)
+
+_COLUNAS = ", ".join(column.name for column in contas.c)
+
+INSERIR_CONTA = text(
+    "INSERT INTO contas (numero, titular, saldo) VALUES (:numero, :titular, :saldo) "
+    f"RETURNING {_COLUNAS}"
+)
+
+ATUALIZAR_SALDO = text(f"UPDATE contas SET saldo = :saldo WHERE id = :conta_id RETURNING {_COLUNAS}")
+
+# Contas por comando na importação em lote: dois parâmetros por conta na inserção
+TAMANHO_CHUNK_CONTAS = 500
+
+
+def _inserir_contas_lote(quantidade: int) -> str:
+    linhas = ", ".join(f"(:numero_{i}, :titular_{i}, 0.0)" for i in range(quantidade))
+    return f"INSERT INTO contas (numero, titular, saldo) VALUES {linhas} RETURNING id, numero"
+
 
 class ContaService:
-    async def create(self, conta: ContaIn) -> int:
-        """Cria uma nova conta corrente"""
-        command = contas.insert().values(
-            numero=conta.numero,
-            titular=conta.titular,
-            saldo=0.0,
-        )
-        return await database.execute(command)
+    async def create(self, conta: ContaIn) -> Record:
+        """Cria uma nova conta corrente e retorna o registro gravado"""
+        command = INSERIR_CONTA.bindparams(numero=conta.numero, titular=conta.titular, saldo=0.0).columns(*contas.c)
+        try:
+            conta_criada = await retry_on_busy(lambda: database.fetch_one(command))
+        except sqlite3.IntegrityError:
+            raise DuplicateContaError
+        numero_cache.set(conta_criada.numero, conta_criada.id)
+        conta_cache.set(conta_criada.id, conta_criada)
+        return conta_criada
+
+    async def create_lote(self, itens: list[ContaIn]) -> list[dict]:
+        """Cria contas em lote, uma transação de banco por bloco de contas.
+
+        Os números de cada bloco são conferidos de uma vez contra o índice de
+        ``numero``; contas já existentes ou repetidas no lote são recusadas
+        individualmente. Retorna um resultado por item, na mesma ordem.
+        """
+        resultados = []
+        vistos: set[str] = set()
+        for indice, item in enumerate(itens):
+            erro = "Número repetido no lote" if item.numero in vistos else None
+            vistos.add(item.numero)
+            resultados.append({"indice": indice, "numero": item.numero, "id": None, "erro": erro})
+
+        for inicio in range(0, len(itens), TAMANHO_CHUNK_CONTAS):
+            bloco = resultados[inicio : inicio + TAMANHO_CHUNK_CONTAS]
+            chunk = [resultado for resultado in bloco if resultado["erro"] is None]
+            if chunk:
+                await retry_on_busy(lambda: self.__inserir_chunk(itens, chunk))
+        return resultados
+
+    async def __inserir_chunk(self, itens: list[ContaIn], chunk: list[dict]) -> None:
+        async with database.transaction():
+            query = select(contas.c.numero).where(contas.c.numero.in_({resultado["numero"] for resultado in chunk}))
+            existentes = {row.numero for row in await database.fetch_all(query)}
+
+            aceitos = []
+            for resultado in chunk:
+                if resultado["numero"] in existentes:
+                    resultado["erro"] = DuplicateContaError().detail
+                else:
+                    aceitos.append(resultado)
+            if not aceitos:
+                return
+
+            values = {}
+            for i, resultado in enumerate(aceitos):
+                values[f"numero_{i}"] = resultado["numero"]
+                values[f"titular_{i}"] = itens[resultado["indice"]].titular
+            rows = await database.fetch_all(_inserir_contas_lote(len(aceitos)), values)
+            ids = {row[1]: row[0] for row in rows}
+            for resultado in aceitos:
+                resultado["id"] = ids[resultado["numero"]]
 
     async def get_by_id(self, conta_id: int) -> Record:
         """Busca uma conta por ID"""
-        query = contas.select().where(contas.c.id == conta_id)
-        conta = await database.fetch_one(query)
+        conta = await conta_cache.get_or_load(conta_id, lambda: self.__fetch_by_id(conta_id))
         if not conta:
             raise NotFoundContaError
         return conta
 
     async def get_by_numero(self, numero: str) -> Record | None:
         """Busca uma conta por número"""
+        conta_id = numero_cache.get(numero)
+        if conta_id is not None:
+            return await conta_cache.get_or_load(conta_id, lambda: self.__fetch_by_id(conta_id))
+
         query = contas.select().where(contas.c.numero == numero)
-        return await database.fetch_one(query)
+        conta = await read_database.fetch_one(query)
+        if conta:
+            numero_cache.set(numero, conta.id)
+            conta_cache.set(conta.id, conta)
+        return conta
 
-    async def update_saldo(self, conta_id: int, novo_saldo: float) -> None:
-        """Atualiza o saldo de uma conta"""
-        command = contas.update().where(contas.c.id == conta_id).values(saldo=novo_saldo)
-        await database.execute(command)
+    async def update_saldo(self, conta_id: int, novo_saldo: float) -> Record:
+        """Atualiza o saldo de uma conta e retorna o registro atualizado"""
+        command = ATUALIZAR_SALDO.bindparams(conta_id=conta_id, saldo=novo_saldo).columns(*contas.c)
+        conta = await database.fetch_one(command)
+        self.invalidate(conta_id)
+        if conta is None:
+            raise NotFoundContaError
+        return conta
 
     async def get_saldo(self, conta_id: int) -> float:
         """Retorna o saldo atual de uma conta"""
         conta = await self.get_by_id(conta_id)
         return float(conta.saldo)
 
+    async def get_com_versao(self, conta_id: int) -> Record:
+        """Lê a conta direto do banco com sua versão: o ID da última transação, que muda a cada lançamento.
+
+        Conta e versão vêm da mesma consulta, sem passar pelo cache, para que a
+        ETag nunca acompanhe um saldo desatualizado de outro processo. O
+        arquivo só é consultado para contas sem transações recentes.
+        """
+        ultimas = [
+            select(tabela.c.id)
+            .where(tabela.c.conta_id == contas.c.id)
+            .order_by(tabela.c.id.desc())
+            .limit(1)
+            .scalar_subquery()
+            for tabela in (transacoes, transacoes_arquivo)
+        ]
+        query = select(contas, func.coalesce(*ultimas, 0).label("versao")).where(contas.c.id == conta_id)
+        conta = await read_database.fetch_one(query)
+        if conta is None:
+            raise NotFoundContaError
+        return conta
+
+    def invalidate(self, conta_id: int) -> None:
+        """Descarta a conta do cache; deve ser chamado após confirmar alterações nela"""
+        conta_cache.pop(conta_id)
+
+    async def __fetch_by_id(self, conta_id: int) -> Record | None:
+        query = contas.select().where(contas.c.id == conta_id)
+        return await read_database.fetch_one(query)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import DateTime, bindparam, func, select, text
+
+from src.cache import LRUCache
+from src.config import settings
+from src.database import database, read_database
+from src.exceptions import IdempotencyKeyMismatchError
+from src.metrics import metrics
+from src.models.idempotencia import idempotencias
+
+# Uma resposta expirada ainda não removida pelo purge é substituída, como se não existisse
+REGISTRAR_RESPOSTA = text(
+    "INSERT INTO idempotencias (user_id, chave, resposta, impressao) VALUES (:user_id, :chave, :resposta, :impressao) "
+    "ON CONFLICT (user_id, chave) DO UPDATE "
+    "SET resposta = excluded.resposta, impressao = excluded.impressao, created_at = excluded.created_at "
+    "WHERE idempotencias.created_at < :limite "
+    "RETURNING user_id"
+).bindparams(bindparam("limite", type_=DateTime(timezone=True)))
+
+resposta_cache = LRUCache(maxsize=settings.idempotency_cache_size, ttl=settings.idempotency_ttl_seconds)
+metrics.register_cache("idempotencia", resposta_cache)
+
+
+class ChaveIdempotenciaEmUso(Exception):
+    """A chave já foi registrada por outra requisição; a transação atual deve ser desfeita"""
+
+
+def _limite_validade() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=settings.idempotency_ttl_seconds)
+
+
+def impressao_requisicao(conta_id: int, corpo: dict) -> str:
+    """Identifica a requisição respondida pela chave: a conta e o corpo enviado"""
+    conteudo = json.dumps({"conta_id": conta_id, "corpo": corpo}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+def _expiracao_cache(created_at: datetime) -> float:
+    # A validade conta a partir do registro da resposta, não da leitura pelo worker
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    restante = created_at + timedelta(seconds=settings.idempotency_ttl_seconds) - datetime.now(timezone.utc)
+    return resposta_cache.clock() + restante.total_seconds()
+
+
+class IdempotenciaService:
+    async def get(self, user_id: int, chave: str, impressao: str) -> dict | None:
+        """Busca a resposta registrada para a chave, se ainda estiver válida.
+
+        Lança ``IdempotencyKeyMismatchError`` quando a chave respondeu a uma
+        requisição com outra impressão (outra conta ou outro corpo).
+        """
+        registro = resposta_cache.get((user_id, chave))
+        if registro is None:
+            query = select(idempotencias.c.resposta, idempotencias.c.impressao, idempotencias.c.created_at).where(
+                idempotencias.c.user_id == user_id,
+                idempotencias.c.chave == chave,
+                idempotencias.c.created_at >= _limite_validade(),
+            )
+            row = await read_database.fetch_one(query)
+            if row is None:
+                return None
+            registro = (row.impressao, json.loads(row.resposta))
+            resposta_cache.set((user_id, chave), registro, expires_at=_expiracao_cache(row.created_at))
+
+        impressao_registrada, resposta = registro
+        if impressao_registrada != impressao:
+            raise IdempotencyKeyMismatchError
+        return resposta
+
+    async def registrar(self, user_id: int, chave: str, impressao: str, resposta: dict) -> None:
+        """Registra a resposta da chave; deve rodar na mesma transação que a produziu"""
+        command = REGISTRAR_RESPOSTA.bindparams(
+            user_id=user_id,
+            chave=chave,
+            resposta=json.dumps(resposta),
+            impressao=impressao,
+            limite=_limite_validade(),
+        )
+        if await database.fetch_val(command) is None:
+            raise ChaveIdempotenciaEmUso
+
+    def lembrar(self, user_id: int, chave: str, impressao: str, resposta: dict) -> None:
+        """Mantém a resposta em memória; deve ser chamado após o commit"""
+        resposta_cache.set((user_id, chave), (impressao, resposta))
+
+    async def purge(self) -> int:
+        """Remove as respostas expiradas e retorna quantas foram removidas"""
+        expiradas = idempotencias.c.created_at < _limite_validade()
+        async with database.transaction():
+            total = await database.fetch_val(select(func.count()).select_from(idempotencias).where(expiradas))
+            await database.execute(idempotencias.delete().where(expiradas))
+        return total
@@ -1,38 +1,87 @@
+from datetime import datetime, timezone
+
 from databases.interfaces import Record
+from sqlalchemy import bindparam, select, text, tuple_
 
-from src.database import database
+from src.database import database, read_database
 from src.exceptions import NotFoundPostError
-from src.models.post import posts
+from src.models.post import posts, posts_fts
 from src.schemas.post import PostIn, PostUpdateIn
 
+_COLUNAS = ", ".join(column.name for column in posts.c)
+
+# Mais recentes primeiro; posts sem data de publicação ficam no fim
+ORDEM = (posts.c.published_at.desc(), posts.c.id.desc())
+
+
+def _utc(momento: datetime | None) -> datetime | None:
+    """Converte para UTC sem fuso, para que a ordenação por ``published_at`` seja cronológica"""
+    if momento is not None and momento.tzinfo is not None:
+        momento = momento.astimezone(timezone.utc).replace(tzinfo=None)
+    return momento
+
+
+def _returning(sql: str, valores: dict):
+    """Comando com RETURNING de todas as colunas, com os parâmetros tipados pelas colunas de posts"""
+    parametros = [bindparam(nome, valor, type_=posts.c[nome].type) for nome, valor in valores.items()]
+    return text(f"{sql} RETURNING {_COLUNAS}").bindparams(*parametros).columns(*posts.c)
+
+
+def _termos_fts(q: str) -> str:
+    """Transforma a busca em termos literais do FTS5, todos obrigatórios"""
+    return " ".join('"{}"'.format(termo.replace('"', '""')) for termo in q.split())
+
 
 class PostService:
-    async def read_all(self, published: bool, limit: int, skip: int = 0) -> list[Record]:
-        query = posts.select().where(posts.c.published == published).limit(limit).offset(skip)
-        return await database.fetch_all(query)
-
-    async def create(self, post: PostIn) -> int:
-        command = posts.insert().values(
-            title=post.title,
-            content=post.content,
-            published_at=post.published_at,
-            published=post.published,
+    async def read_all(
+        self, published: bool, limit: int, apos: tuple[datetime | None, int] | None = None
+    ) -> list[Record]:
+        query = posts.select().where(posts.c.published == published)
+        return await self.__paginar(query, limit, apos)
+
+    async def search(
+        self,
+        q: str,
+        limit: int,
+        published: bool | None = None,
+        apos: tuple[datetime | None, int] | None = None,
+    ) -> list[Record]:
+        termos = _termos_fts(q)
+        if not termos:
+            return []
+
+        query = (
+            select(posts)
+            .select_from(posts.join(posts_fts, posts_fts.c.rowid == posts.c.id))
+            .where(text("posts_fts MATCH :termos").bindparams(termos=termos))
         )
-        return await database.execute(command)
+        if published is not None:
+            query = query.where(posts.c.published == published)
+        return await self.__paginar(query, limit, apos)
+
+    async def create(self, post: PostIn) -> Record:
+        data = post.model_dump()
+        data["published_at"] = _utc(data["published_at"])
+        command = _returning(
+            f"INSERT INTO posts ({', '.join(data)}) VALUES ({', '.join(f':{nome}' for nome in data)})", data
+        )
+        return await database.fetch_one(command)
 
     async def read(self, id: int) -> Record:
         return await self.__get_by_id(id)
 
     async def update(self, id: int, post: PostUpdateIn) -> Record:
-        total = await self.count(id)
-        if not total:
-            raise NotFoundPostError
-
         data = post.model_dump(exclude_unset=True)
-        command = posts.update().where(posts.c.id == id).values(**data)
-        await database.execute(command)
+        if "published_at" in data:
+            data["published_at"] = _utc(data["published_at"])
 
-        return await self.__get_by_id(id)
+        # Sem campos alterados, "id = id" ainda confirma a existência e devolve o post
+        atribuicoes = ", ".join(f"{nome} = :{nome}" for nome in data) or "id = id"
+        command = _returning(f"UPDATE posts SET {atribuicoes} WHERE id = :id", {**data, "id": id})
+        updated = await database.fetch_one(command)
+        if not updated:
+            raise NotFoundPostError
+        return updated
 
     async def delete(self, id: int) -> None:
         command = posts.delete().where(posts.c.id == id)
@@ -40,12 +89,36 @@ class PostService:
 
     async def count(self, id: int) -> int:
         query = "select count(id) as total from posts where id = :id"
-        result = await database.fetch_one(query, {"id": id})
+        result = await read_database.fetch_one(query, {"id": id})
         return result.total
 
+    async def __paginar(self, query, limit: int, apos: tuple[datetime | None, int] | None) -> list[Record]:
+        """Keyset em (published_at, id) com os posts sem data no fim.
+
+        Cada condição é uma faixa contígua do índice: os posts com data depois
+        do cursor e, se a página não encher, os posts sem data.
+        """
+        if apos is None:
+            return await read_database.fetch_all(query.order_by(*ORDEM).limit(limit))
+
+        published_at, last_id = apos
+        rows = []
+        if published_at is not None:
+            com_data = query.where(tuple_(posts.c.published_at, posts.c.id) < tuple_(_utc(published_at), last_id))
+            rows = await read_database.fetch_all(com_data.order_by(*ORDEM).limit(limit))
+            if len(rows) == limit:
+                return rows
+            last_id = None
+
+        sem_data = query.where(posts.c.published_at.is_(None))
+        if last_id is not None:
+            sem_data = sem_data.where(posts.c.id < last_id)
+        sem_data = sem_data.order_by(posts.c.id.desc()).limit(limit - len(rows))
+        return rows + await read_database.fetch_all(sem_data)
+
     async def __get_by_id(self, id: int) -> Record:
         query = posts.select().where(posts.c.id == id)
-        post = await database.fetch_one(query)
+        post = await read_database.fetch_one(query)
         if not post:
             raise NotFoundPostError
-        return post
\ No newline at end of file
+        return post
@@ -0,0 +1,242 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Date, case, func, literal, select
+
+from src.database import database, read_database
+from src.models.checkpoint import checkpoints
+from src.models.saldo_snapshot import saldos_snapshot
+from src.schemas.transacao import Granularidade, TipoTransacao
+from src.services.arquivo import ArquivoService, fonte_transacoes
+from src.services.conta import ContaService
+
+CHECKPOINT_SNAPSHOT = "saldos_snapshot"
+
+
+def _delta_saldo(fonte):
+    """Soma das transações com sinal: depósitos somam e saques subtraem"""
+    return func.sum(case((fonte.c.tipo == TipoTransacao.SAQUE.value, -fonte.c.valor), else_=fonte.c.valor))
+
+
+def _total_depositos(fonte):
+    return func.sum(case((fonte.c.tipo == TipoTransacao.DEPOSITO.value, fonte.c.valor), else_=0.0))
+
+
+def _total_saques(fonte):
+    return func.sum(case((fonte.c.tipo == TipoTransacao.SAQUE.value, fonte.c.valor), else_=0.0))
+
+
+def _periodo(coluna, granularidade: Granularidade):
+    """Expressão SQL do primeiro dia do período que contém ``coluna``"""
+    if granularidade == Granularidade.SEMANA:
+        return func.date(coluna, "weekday 0", "-6 days")
+    if granularidade == Granularidade.MES:
+        return func.strftime("%Y-%m-01", coluna)
+    return func.date(coluna)
+
+
+def _utc(momento: datetime) -> datetime:
+    """Converte para UTC sem fuso, o formato gravado em ``created_at``"""
+    if momento.tzinfo is not None:
+        momento = momento.astimezone(timezone.utc).replace(tzinfo=None)
+    return momento
+
+
+def _inicio_do_dia(dia: date):
+    # Comparar com a data pura funciona para timestamps gravados com ou sem microssegundos
+    return literal(dia, Date)
+
+
+class SaldoService:
+    def __init__(self):
+        self.conta_service = ContaService()
+        self.arquivo_service = ArquivoService()
+
+    async def get_saldo_em(self, conta_id: int, em: datetime) -> float:
+        """Retorna o saldo de uma conta em um instante.
+
+        Parte do snapshot mais recente anterior ao dia de ``em`` e soma apenas
+        as transações posteriores a ele.
+        """
+        await self.conta_service.get_by_id(conta_id)
+        em = _utc(em)
+
+        query = (
+            select(saldos_snapshot.c.dia, saldos_snapshot.c.saldo, saldos_snapshot.c.ultima_transacao_id)
+            .where(saldos_snapshot.c.conta_id == conta_id, saldos_snapshot.c.dia < em.date())
+            .order_by(saldos_snapshot.c.dia.desc())
+            .limit(1)
+        )
+        snapshot = await read_database.fetch_one(query)
+
+        desde = snapshot.dia + timedelta(days=1) if snapshot else None
+        fonte = fonte_transacoes(await self.arquivo_service.get_corte(), desde)
+
+        saldo = 0.0
+        query = select(func.coalesce(_delta_saldo(fonte), 0.0)).where(
+            fonte.c.conta_id == conta_id,
+            fonte.c.created_at <= em,
+        )
+        if snapshot:
+            saldo = float(snapshot.saldo)
+            query = query.where(fonte.c.created_at >= _inicio_do_dia(desde))
+        return saldo + float(await read_database.fetch_val(query))
+
+    async def get_resumo(
+        self, conta_id: int, granularidade: Granularidade, de: date | None = None, ate: date | None = None
+    ) -> list[dict]:
+        """Totais de depósitos e saques por período, entre ``de`` e ``ate`` (inclusive).
+
+        Os dias já consolidados em snapshots são agregados a partir de uma
+        linha por dia; somente as transações posteriores ao último snapshot
+        são agregadas diretamente.
+        """
+        await self.conta_service.get_by_id(conta_id)
+        periodos: dict[str, dict] = {}
+
+        def acumular(rows):
+            for row in rows:
+                periodo = periodos.setdefault(
+                    row.inicio, {"inicio": row.inicio, "total_depositos": 0.0, "total_saques": 0.0, "quantidade": 0}
+                )
+                periodo["total_depositos"] += float(row.total_depositos)
+                periodo["total_saques"] += float(row.total_saques)
+                periodo["quantidade"] += int(row.quantidade)
+
+        ultimo_dia = await read_database.fetch_val(
+            select(func.max(saldos_snapshot.c.dia)).where(saldos_snapshot.c.conta_id == conta_id)
+        )
+
+        if ultimo_dia is not None and (de is None or de <= ultimo_dia):
+            inicio = _periodo(saldos_snapshot.c.dia, granularidade)
+            query = (
+                select(
+                    inicio.label("inicio"),
+                    func.sum(saldos_snapshot.c.total_depositos).label("total_depositos"),
+                    func.sum(saldos_snapshot.c.total_saques).label("total_saques"),
+                    func.sum(saldos_snapshot.c.quantidade).label("quantidade"),
+                )
+                .where(saldos_snapshot.c.conta_id == conta_id)
+                .group_by(inicio)
+            )
+            if de is not None:
+                query = query.where(saldos_snapshot.c.dia >= de)
+            if ate is not None:
+                query = query.where(saldos_snapshot.c.dia <= ate)
+            acumular(await read_database.fetch_all(query))
+
+        inicio_tail = ultimo_dia + timedelta(days=1) if ultimo_dia is not None else None
+        if de is not None and (inicio_tail is None or de > inicio_tail):
+            inicio_tail = de
+        if ate is None or inicio_tail is None or inicio_tail <= ate:
+            fonte = fonte_transacoes(await self.arquivo_service.get_corte(), inicio_tail)
+            inicio = _periodo(fonte.c.created_at, granularidade)
+            query = (
+                select(
+                    inicio.label("inicio"),
+                    _total_depositos(fonte).label("total_depositos"),
+                    _total_saques(fonte).label("total_saques"),
+                    func.count().label("quantidade"),
+                )
+                .where(fonte.c.conta_id == conta_id)
+                .group_by(inicio)
+            )
+            if inicio_tail is not None:
+                query = query.where(fonte.c.created_at >= _inicio_do_dia(inicio_tail))
+            if ate is not None:
+                query = query.where(fonte.c.created_at < _inicio_do_dia(ate + timedelta(days=1)))
+            acumular(await read_database.fetch_all(query))
+
+        return [
+            {**periodo, "inicio": date.fromisoformat(periodo["inicio"])}
+            for _, periodo in sorted(periodos.items())
+        ]
+
+    async def gerar_snapshots(self, ate: date | None = None) -> int:
+        """Atualiza os snapshots de fim de dia das contas com transações novas.
+
+        Considera apenas dias completos, anteriores a ``ate`` (padrão: hoje,
+        UTC). Cada conta é atualizada em sua própria transação e o checkpoint
+        só avança ao final, então uma execução interrompida pode ser repetida.
+        Retorna a quantidade de contas atualizadas.
+        """
+        ate = ate or datetime.now(timezone.utc).date()
+        posicao = await read_database.fetch_val(
+            select(checkpoints.c.posicao).where(checkpoints.c.nome == CHECKPOINT_SNAPSHOT)
+        )
+        # Transações novas podem ter sido arquivadas antes de entrar em um snapshot
+        fonte = fonte_transacoes(await self.arquivo_service.get_corte(), None)
+        query = (
+            select(fonte.c.conta_id, func.max(fonte.c.id).label("ultima_transacao_id"))
+            .where(fonte.c.id > (posicao or 0), fonte.c.created_at < _inicio_do_dia(ate))
+            .group_by(fonte.c.conta_id)
+        )
+        contas_ativas = await read_database.fetch_all(query)
+        if not contas_ativas:
+            return 0
+
+        for conta in contas_ativas:
+            async with database.transaction():
+                await self.__atualizar_conta(conta.conta_id, ate)
+
+        async with database.transaction():
+            await database.execute(checkpoints.delete().where(checkpoints.c.nome == CHECKPOINT_SNAPSHOT))
+            await database.execute(
+                checkpoints.insert().values(
+                    nome=CHECKPOINT_SNAPSHOT,
+                    posicao=max(conta.ultima_transacao_id for conta in contas_ativas),
+                )
+            )
+        return len(contas_ativas)
+
+    async def __atualizar_conta(self, conta_id: int, ate: date) -> None:
+        query = (
+            select(saldos_snapshot.c.dia, saldos_snapshot.c.saldo, saldos_snapshot.c.ultima_transacao_id)
+            .where(saldos_snapshot.c.conta_id == conta_id)
+            .order_by(saldos_snapshot.c.dia.desc())
+            .limit(1)
+        )
+        ultimo = await database.fetch_one(query)
+        desde = ultimo.dia + timedelta(days=1) if ultimo else None
+        fonte = fonte_transacoes(await self.arquivo_service.get_corte(), desde)
+
+        # Novas transações de um dia já fechado não existem: created_at é gravado na inserção
+        dia = func.date(fonte.c.created_at)
+        query = (
+            select(
+                dia.label("dia"),
+                _total_depositos(fonte).label("total_depositos"),
+                _total_saques(fonte).label("total_saques"),
+                func.count().label("quantidade"),
+                func.max(fonte.c.id).label("ultima_transacao_id"),
+            )
+            .where(fonte.c.conta_id == conta_id, fonte.c.created_at < _inicio_do_dia(ate))
+            .group_by(dia)
+            .order_by(dia)
+        )
+        saldo = 0.0
+        if ultimo:
+            saldo = float(ultimo.saldo)
+            query = query.where(fonte.c.created_at >= _inicio_do_dia(desde))
+
+        snapshots = []
+        for row in await database.fetch_all(query):
+            saldo += float(row.total_depositos) - float(row.total_saques)
+            snapshots.append(
+                {
+                    "conta_id": conta_id,
+                    "dia": date.fromisoformat(row.dia),
+                    "saldo": saldo,
+                    "total_depositos": float(row.total_depositos),
+                    "total_saques": float(row.total_saques),
+                    "quantidade": row.quantidade,
+                    "ultima_transacao_id": row.ultima_transacao_id,
+                }
+            )
+        if snapshots:
+            await database.execute(
+                saldos_snapshot.delete().where(
+                    saldos_snapshot.c.conta_id == conta_id,
+                    saldos_snapshot.c.dia >= snapshots[0]["dia"],
+                )
+            )
+            await database.execute_many(saldos_snapshot.insert(), snapshots)
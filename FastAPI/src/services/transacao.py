@@ -1,60 +1,296 @@
+from collections.abc import AsyncIterator
+from datetime import date, timedelta
+
 from databases.interfaces import Record
+from sqlalchemy import Date, func, literal, select, text, tuple_
 
-from src.database import database
-from src.exceptions import InsufficientBalanceError, InvalidAmountError, NotFoundContaError, NotFoundTransacaoError
+from src.database import database, read_database, retry_on_busy, run_in_transaction
+from src.events import broker
+from src.exceptions import (
+    IdempotencyKeyConflictError,
+    InsufficientBalanceError,
+    NotFoundContaError,
+    NotFoundTransacaoError,
+)
+from src.locks import travar_contas
+from src.models.conta import contas
 from src.models.transacao import transacoes
-from src.schemas.transacao import TipoTransacao, TransacaoIn
+from src.models.transacao_arquivo import transacoes_arquivo
+from src.responses import as_dicts
+from src.schemas.transacao import EventoTransacaoOut, TipoTransacao, TransacaoIn, TransacaoLoteIn, TransacaoOut
+from src.services.arquivo import ArquivoService, fonte_transacoes, todas_transacoes
 from src.services.conta import ContaService
+from src.services.idempotencia import ChaveIdempotenciaEmUso, IdempotenciaService, impressao_requisicao
+
+# Lançamento condicional: só altera o saldo se ele não ficar negativo.
+# Depósitos usam delta positivo e saques delta negativo.
+LANCAR_SALDO = text(
+    "UPDATE contas SET saldo = saldo + :delta "
+    "WHERE id = :conta_id AND saldo + :delta >= 0 "
+    "RETURNING saldo"
+)
+
+INSERIR_TRANSACAO = text(
+    "INSERT INTO transacoes (conta_id, tipo, valor, descricao) "
+    "VALUES (:conta_id, :tipo, :valor, :descricao) "
+    f"RETURNING {', '.join(column.name for column in transacoes.c)}"
+)
+
+ATUALIZAR_SALDO_LOTE = "UPDATE contas SET saldo = saldo + :delta WHERE id = :conta_id"
+
+# Colunas da exportação: as da transação e, opcionalmente, as da conta
+CAMPOS_EXPORTACAO = tuple(column.name for column in transacoes.c)
+CAMPOS_CONTA_EXPORTACAO = ("conta_numero", "conta_titular")
+
+# Linhas por INSERT de lote: 4 parâmetros por linha, abaixo do limite de variáveis do SQLite
+TAMANHO_CHUNK_LOTE = 200
+
+
+def _delta(transacao: TransacaoIn) -> float:
+    return -transacao.valor if transacao.tipo == TipoTransacao.SAQUE else transacao.valor
+
+
+def _inserir_transacoes_lote(quantidade: int) -> str:
+    linhas = ", ".join(f"(:conta_id_{i}, :tipo_{i}, :valor_{i}, :descricao_{i})" for i in range(quantidade))
+    return (
+        f"INSERT INTO transacoes (conta_id, tipo, valor, descricao) VALUES {linhas} "
+        f"RETURNING {', '.join(column.name for column in transacoes.c)}"
+    )
 
 
 class TransacaoService:
     def __init__(self):
         self.conta_service = ContaService()
+        self.idempotencia_service = IdempotenciaService()
+        self.arquivo_service = ArquivoService()
 
-    async def create(self, conta_id: int, transacao: TransacaoIn) -> Record:
-        """Cria uma nova transação (depósito ou saque)"""
-        # Valida se a conta existe
-        conta = await self.conta_service.get_by_id(conta_id)
+    async def create(
+        self,
+        conta_id: int,
+        transacao: TransacaoIn,
+        user_id: int | None = None,
+        chave_idempotencia: str | None = None,
+    ) -> Record | dict:
+        """Cria uma nova transação (depósito ou saque) em uma única transação de banco.
+
+        Com ``chave_idempotencia``, a resposta é registrada na mesma transação
+        do lançamento e repetições da chave pelo mesmo usuário, para a mesma
+        conta e o mesmo corpo, devolvem a resposta registrada sem lançar
+        novamente; a chave reutilizada em outra requisição é recusada. Lançamentos concorrentes da
+        mesma conta são serializados no processo por ``travar_contas``.
+        """
+        if chave_idempotencia is None:
+            async with travar_contas(conta_id):
+                transacao_criada, saldo = await run_in_transaction(lambda: self.lancar(conta_id, transacao))
+            self.conta_service.invalidate(conta_id)
+            self.publicar(conta_id, transacao_criada, saldo)
+            return transacao_criada
 
-        # Calcula novo saldo
-        saldo_atual = float(conta.saldo)
+        impressao = impressao_requisicao(conta_id, transacao.model_dump(mode="json"))
+        resposta = await self.idempotencia_service.get(user_id, chave_idempotencia, impressao)
+        if resposta is not None:
+            return resposta
 
-        if transacao.tipo == TipoTransacao.SAQUE:
-            # Valida saldo suficiente para saque
-            if saldo_atual < transacao.valor:
-                raise InsufficientBalanceError
-            novo_saldo = saldo_atual - transacao.valor
-        else:  # DEPOSITO
-            novo_saldo = saldo_atual + transacao.valor
+        async def lancar_com_chave() -> tuple[dict, float]:
+            transacao_criada, saldo = await self.lancar(conta_id, transacao)
+            resposta = TransacaoOut(**dict(transacao_criada)).model_dump(mode="json")
+            await self.idempotencia_service.registrar(user_id, chave_idempotencia, impressao, resposta)
+            return resposta, saldo
 
-        # Atualiza saldo da conta
-        await self.conta_service.update_saldo(conta_id, novo_saldo)
+        try:
+            async with travar_contas(conta_id):
+                resposta, saldo = await run_in_transaction(lancar_com_chave)
+        except ChaveIdempotenciaEmUso:
+            # Outra requisição com a mesma chave confirmou primeiro
+            resposta = await self.idempotencia_service.get(user_id, chave_idempotencia, impressao)
+            if resposta is None:
+                # A resposta registrada expirou entre o conflito e a leitura
+                raise IdempotencyKeyConflictError
+            return resposta
+        self.conta_service.invalidate(conta_id)
+        self.idempotencia_service.lembrar(user_id, chave_idempotencia, impressao, resposta)
+        self.publicar(conta_id, resposta, saldo)
+        return resposta
 
-        # Cria a transação
-        command = transacoes.insert().values(
+    async def lancar(self, conta_id: int, transacao: TransacaoIn) -> tuple[Record, float]:
+        """Aplica a transação ao saldo e grava o lançamento, retornando-o com o novo saldo.
+
+        Deve ser chamado dentro de uma transação de banco; quem chama invalida
+        a conta no cache após o commit. O saldo é alterado com um UPDATE
+        condicional, sem leitura prévia da conta; a consulta de existência só
+        é feita quando o lançamento é recusado.
+        """
+        saldo = await database.fetch_val(LANCAR_SALDO.bindparams(conta_id=conta_id, delta=_delta(transacao)))
+        if saldo is None:
+            existe = await database.fetch_val(select(contas.c.id).where(contas.c.id == conta_id))
+            if existe is None:
+                raise NotFoundContaError
+            raise InsufficientBalanceError
+
+        command = INSERIR_TRANSACAO.bindparams(
             conta_id=conta_id,
             tipo=transacao.tipo.value,
             valor=transacao.valor,
             descricao=transacao.descricao,
-        )
-        transacao_id = await database.execute(command)
+        ).columns(*transacoes.c)
+        return await database.fetch_one(command), saldo
+
+    def publicar(self, conta_id: int, transacao: Record | dict, saldo: float) -> None:
+        """Envia a transação confirmada aos ouvintes da conta; chamado após o commit"""
+        if broker.assinantes(conta_id):
+            evento = EventoTransacaoOut(transacao=dict(transacao), saldo=saldo)
+            broker.publish(conta_id, evento.model_dump_json())
 
-        # Retorna a transação criada
-        return await self.get_by_id(transacao_id)
+    async def create_lote(self, itens: list[TransacaoLoteIn]) -> list[dict]:
+        """Aplica um lote de transações em uma única transação de banco.
+
+        Os itens de cada conta são aplicados na ordem do lote. Itens de contas
+        inexistentes ou sem saldo são recusados individualmente, sem afetar os
+        demais. Como nos lançamentos individuais, as contas do lote ficam
+        travadas por ``travar_contas`` e cada transação criada é publicada aos
+        ouvintes da conta após o commit. Retorna um resultado por item, na
+        mesma ordem.
+        """
+
+        async def aplicar() -> tuple[list[dict], dict[int, float], list[tuple[int, dict, float]]]:
+            async with database.transaction():
+                # Os saldos lidos aqui valem até o commit porque todas as escritas do
+                # processo passam pela única conexão de escrita (SQLite não tem bloqueio
+                # por linha); outros processos esperam pelo lock de escrita do arquivo
+                query = select(contas.c.id, contas.c.saldo).where(contas.c.id.in_({item.conta_id for item in itens}))
+                saldos = {conta.id: float(conta.saldo) for conta in await database.fetch_all(query)}
+                deltas: dict[int, float] = {}
+                resultados = []
+                aceitos = []
+                saldos_aceitos = []
+
+                for indice, item in enumerate(itens):
+                    resultado = {"indice": indice, "conta_id": item.conta_id, "id": None, "erro": None}
+                    resultados.append(resultado)
+                    if item.conta_id not in saldos:
+                        resultado["erro"] = NotFoundContaError().detail
+                        continue
+                    novo_saldo = saldos[item.conta_id] + _delta(item)
+                    if novo_saldo < 0:
+                        resultado["erro"] = InsufficientBalanceError().detail
+                        continue
+                    saldos[item.conta_id] = novo_saldo
+                    deltas[item.conta_id] = deltas.get(item.conta_id, 0.0) + _delta(item)
+                    aceitos.append(resultado)
+                    saldos_aceitos.append(novo_saldo)
+
+                if deltas:
+                    await database.execute_many(
+                        ATUALIZAR_SALDO_LOTE,
+                        [{"conta_id": conta_id, "delta": delta} for conta_id, delta in sorted(deltas.items())],
+                    )
+
+                criadas = []
+                for inicio in range(0, len(aceitos), TAMANHO_CHUNK_LOTE):
+                    chunk = aceitos[inicio : inicio + TAMANHO_CHUNK_LOTE]
+                    values = {}
+                    for i, resultado in enumerate(chunk):
+                        item = itens[resultado["indice"]]
+                        values[f"conta_id_{i}"] = item.conta_id
+                        values[f"tipo_{i}"] = item.tipo.value
+                        values[f"valor_{i}"] = item.valor
+                        values[f"descricao_{i}"] = item.descricao
+                    rows = await database.fetch_all(_inserir_transacoes_lote(len(chunk)), values)
+                    # Dentro da transação de escrita os IDs são alocados em ordem crescente de inserção
+                    for resultado, transacao in zip(chunk, sorted(as_dicts(rows), key=lambda row: row["id"])):
+                        resultado["id"] = transacao["id"]
+                        criadas.append(transacao)
+            eventos = [(t["conta_id"], t, saldo) for t, saldo in zip(criadas, saldos_aceitos)]
+            return resultados, deltas, eventos
+
+        async with travar_contas(*{item.conta_id for item in itens}):
+            resultados, deltas, eventos = await retry_on_busy(aplicar)
+
+        for conta_id in deltas:
+            self.conta_service.invalidate(conta_id)
+        for conta_id, transacao, saldo in eventos:
+            self.publicar(conta_id, transacao, saldo)
+        return resultados
 
     async def get_by_id(self, transacao_id: int) -> Record:
-        """Busca uma transação por ID"""
+        """Busca uma transação por ID, na tabela quente e depois no arquivo"""
         query = transacoes.select().where(transacoes.c.id == transacao_id)
-        transacao = await database.fetch_one(query)
+        transacao = await read_database.fetch_one(query)
+        if not transacao:
+            query = transacoes_arquivo.select().where(transacoes_arquivo.c.id == transacao_id)
+            transacao = await read_database.fetch_one(query)
         if not transacao:
             raise NotFoundTransacaoError
         return transacao
 
-    async def get_by_conta(self, conta_id: int) -> list[Record]:
-        """Busca todas as transações de uma conta"""
+    async def get_by_conta(self, conta_id: int, limit: int, apos_id: int | None = None) -> list[Record]:
+        """Busca uma página de transações de uma conta, da mais recente para a mais antiga.
+
+        A paginação é por keyset em (created_at, id): ``apos_id`` é o ID da
+        última transação da página anterior. O arquivo só é consultado quando
+        a página passa da transação mais antiga da tabela quente.
+        """
         # Valida se a conta existe
         await self.conta_service.get_by_id(conta_id)
 
-        query = transacoes.select().where(transacoes.c.conta_id == conta_id).order_by(transacoes.c.created_at.desc())
-        return await database.fetch_all(query)
+        pagina = await read_database.fetch_all(self.__pagina(transacoes, conta_id, limit, apos_id))
+        if len(pagina) < limit and await self.arquivo_service.get_corte() is not None:
+            # Refaz a página sobre as duas tabelas em uma única leitura, para não
+            # duplicar transações movidas por um lote de arquivamento entre as consultas
+            pagina = await read_database.fetch_all(self.__pagina(todas_transacoes(), conta_id, limit, apos_id))
+        return pagina
+
+    @staticmethod
+    def __pagina(fonte, conta_id: int, limit: int, apos_id: int | None):
+        query = select(fonte).where(fonte.c.conta_id == conta_id)
+        if apos_id is not None:
+            # A transação do cursor pode já ter sido arquivada
+            ancora = todas_transacoes()
+            anterior = (
+                select(ancora.c.created_at, ancora.c.id)
+                .where(ancora.c.id == apos_id, ancora.c.conta_id == conta_id)
+                .scalar_subquery()
+            )
+            query = query.where(tuple_(fonte.c.created_at, fonte.c.id) < anterior)
+        return query.order_by(fonte.c.created_at.desc(), fonte.c.id.desc()).limit(limit)
+
+    async def exportar(
+        self,
+        de: date | None = None,
+        ate: date | None = None,
+        apos_id: int | None = None,
+        incluir_conta: bool = False,
+    ) -> AsyncIterator[Record]:
+        """Itera as transações de todas as contas no período, em ordem de ID.
+
+        As linhas vêm do cursor do banco, sem carregar o resultado em memória;
+        ``apos_id`` retoma uma exportação interrompida depois da última
+        transação recebida.
+        """
+        fonte = fonte_transacoes(await self.arquivo_service.get_corte(), de)
+
+        # Comparar com a data pura funciona para timestamps gravados com ou sem microssegundos
+        periodo = []
+        if de is not None:
+            periodo.append(fonte.c.created_at >= literal(de, Date))
+        if ate is not None:
+            periodo.append(fonte.c.created_at < literal(ate + timedelta(days=1), Date))
+
+        if incluir_conta:
+            query = select(
+                fonte, contas.c.numero.label("conta_numero"), contas.c.titular.label("conta_titular")
+            ).select_from(fonte.join(contas, contas.c.id == fonte.c.conta_id))
+        else:
+            query = select(fonte)
+
+        if periodo:
+            # Limita a varredura por ID à faixa do período, obtida pelo índice de created_at
+            menor, maior = await read_database.fetch_one(select(func.min(fonte.c.id), func.max(fonte.c.id)).where(*periodo))
+            if menor is None:
+                return
+            query = query.where(fonte.c.id.between(menor, maior), *periodo)
+        if apos_id is not None:
+            query = query.where(fonte.c.id > apos_id)
 
+        async for row in read_database.iterate(query.order_by(fonte.c.id)):
+            yield row
@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from src.database import database, run_in_transaction
+from src.locks import travar_contas
+from src.models.transferencia import transferencias
+from src.schemas.transacao import TipoTransacao, TransacaoIn
+from src.schemas.transferencia import TransferenciaIn
+from src.services.transacao import TransacaoService
+
+INSERIR_TRANSFERENCIA = text(
+    "INSERT INTO transferencias "
+    "(conta_origem_id, conta_destino_id, valor, descricao, transacao_debito_id, transacao_credito_id) "
+    "VALUES (:conta_origem_id, :conta_destino_id, :valor, :descricao, :transacao_debito_id, :transacao_credito_id) "
+    f"RETURNING {', '.join(column.name for column in transferencias.c)}"
+)
+
+
+class TransferenciaService:
+    def __init__(self):
+        self.transacao_service = TransacaoService()
+
+    async def create(self, transferencia: TransferenciaIn) -> dict:
+        """Transfere o valor entre as contas em uma única transação de banco.
+
+        Débito e crédito são lançados em ordem crescente de ID de conta, para
+        que transferências concorrentes em sentidos opostos bloqueiem as contas
+        sempre na mesma ordem.
+        """
+        async with travar_contas(transferencia.conta_origem_id, transferencia.conta_destino_id):
+            resultado, saldos = await run_in_transaction(lambda: self.transferir(transferencia))
+        for perna, conta_id in (("debito", transferencia.conta_origem_id), ("credito", transferencia.conta_destino_id)):
+            self.transacao_service.conta_service.invalidate(conta_id)
+            self.transacao_service.publicar(conta_id, resultado[perna], saldos[conta_id])
+        return resultado
+
+    async def transferir(self, transferencia: TransferenciaIn) -> tuple[dict, dict[int, float]]:
+        """Lança as duas pernas e grava a transferência; deve ser chamado dentro de uma transação de banco"""
+        pernas = {
+            transferencia.conta_origem_id: TransacaoIn(
+                tipo=TipoTransacao.SAQUE, valor=transferencia.valor, descricao=transferencia.descricao
+            ),
+            transferencia.conta_destino_id: TransacaoIn(
+                tipo=TipoTransacao.DEPOSITO, valor=transferencia.valor, descricao=transferencia.descricao
+            ),
+        }
+        lancadas = {}
+        saldos = {}
+        for conta_id in sorted(pernas):
+            lancadas[conta_id], saldos[conta_id] = await self.transacao_service.lancar(conta_id, pernas[conta_id])
+
+        debito = lancadas[transferencia.conta_origem_id]
+        credito = lancadas[transferencia.conta_destino_id]
+        command = INSERIR_TRANSFERENCIA.bindparams(
+            conta_origem_id=transferencia.conta_origem_id,
+            conta_destino_id=transferencia.conta_destino_id,
+            valor=transferencia.valor,
+            descricao=transferencia.descricao,
+            transacao_debito_id=debito.id,
+            transacao_credito_id=credito.id,
+        ).columns(*transferencias.c)
+        criada = await database.fetch_one(command)
+        return {**dict(criada), "debito": dict(debito), "credito": dict(credito)}, saldos
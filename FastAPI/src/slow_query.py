@@ -0,0 +1,88 @@
+import logging
+import sys
+from typing import Any
+
+from databases import Database
+from databases.core import Connection
+
+from src.cache import LRUCache
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _shape(values: Any) -> Any:
+    """Descreve os parâmetros pelos nomes e tipos, sem expor os valores"""
+    if isinstance(values, dict):
+        return {key: type(value).__name__ for key, value in values.items()}
+    if isinstance(values, (list, tuple)):
+        return [_shape(values[0]), f"x{len(values)}"] if values else []
+    return type(values).__name__
+
+
+def _origem() -> str:
+    """Primeiro método de serviço na pilha de chamadas da consulta"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith("src.services."):
+            return f"{frame.f_globals['__name__']}:{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return "desconhecida"
+
+
+class SlowQueryLog:
+    """Registra consultas acima do limite com SQL, formato dos parâmetros e origem.
+
+    No SQLite, o ``EXPLAIN QUERY PLAN`` de cada formato de consulta é capturado
+    na primeira ocorrência lenta e mantido em cache; planos com varredura
+    completa de tabela são destacados no log.
+    """
+
+    def __init__(self, threshold_ms: float, explain: bool = True, max_plans: int = 1000):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.plans = LRUCache(maxsize=max_plans)
+
+    def is_slow(self, duration: float) -> bool:
+        return self.threshold > 0 and duration >= self.threshold
+
+    async def record(self, db: Database, operation: str, query: Any, values: Any, duration: float) -> None:
+        try:
+            origem = _origem()
+            primeiro = values[0] if operation == "execute_many" and values else values
+            compiled = Connection._build_query(query, primeiro).compile(
+                dialect=db._backend._dialect, compile_kwargs={"render_postcompile": True}
+            )
+            sql = " ".join(compiled.string.split())
+            plano = None
+            if self.explain and db.url.dialect == "sqlite":
+                plano = await self._plan(db, sql, compiled)
+
+            metrics.increment("db_slow_queries_total", labels=f'origem="{origem}"')
+            logger.warning(
+                "Consulta lenta: %.1f ms em %s (%s) | SQL: %s | parâmetros: %s | plano: %s",
+                duration * 1000,
+                origem,
+                operation,
+                sql,
+                _shape(values if values is not None else compiled.params),
+                plano,
+            )
+        except Exception:
+            logger.exception("Falha ao registrar consulta lenta")
+
+    async def _plan(self, db: Database, sql: str, compiled) -> str:
+        plano = self.plans.get(sql)
+        if plano is not None:
+            return plano
+
+        args = [compiled.params[key] for key in compiled.positiontup or []]
+        async with db.connection() as connection:
+            async with connection.raw_connection.execute(f"EXPLAIN QUERY PLAN {compiled.string}", args) as cursor:
+                detalhes = [row[-1] for row in await cursor.fetchall()]
+        plano = "; ".join(detalhes) or "-"
+        # "SCAN tabela" sem índice indica varredura completa
+        if any(detalhe.startswith("SCAN ") and " INDEX " not in detalhe for detalhe in detalhes):
+            plano = f"VARREDURA COMPLETA: {plano}"
+        self.plans.set(sql, plano)
+        return plano
@@ -5,4 +5,9 @@ class PostOut(BaseModel):
     id: int
     title: str
     content: str
-    published_at: AwareDatetime | NaiveDatetime | None
\ No newline at end of file
+    published_at: AwareDatetime | NaiveDatetime | None
+
+
+class PostPageOut(BaseModel):
+    posts: list[PostOut]
+    proximo_cursor: str | None = None
@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# O banco precisa estar definido antes de importar src.config
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='testes_')}/teste.db"
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@asynccontextmanager
+async def cliente():
+    """Cliente HTTP autenticado contra a aplicação, com o lifespan dela em execução"""
+    import httpx
+
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://teste") as client:
+            resposta = await client.post("/auth/login", json={"user_id": 1})
+            client.headers["Authorization"] = f"Bearer {resposta.json()['access_token']}"
+            yield client
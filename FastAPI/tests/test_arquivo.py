@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from conftest import cliente
+
+from src.config import settings
+from src.database import database
+from src.models.transacao import transacoes
+from src.models.transferencia import transferencias
+from src.schema import init_schema
+from src.services.arquivo import ArquivoService
+from src.services.transacao import TransacaoService
+
+
+def test_ids_de_transacoes_arquivadas_nao_sao_reutilizados():
+    async def cenario():
+        async with cliente() as client:
+            conta = (await client.post("/contas/", json={"numero": "arq-1", "titular": "Arquivo"})).json()
+            ids = []
+            for _ in range(3):
+                resposta = await client.post(f"/transacoes/contas/{conta['id']}", json={"tipo": "deposito", "valor": 10})
+                ids.append(resposta.json()["id"])
+            await database.execute(
+                transacoes.update().where(transacoes.c.id.in_(ids)).values(created_at=datetime(2020, 1, 1))
+            )
+
+            hoje = date.today() + timedelta(days=1)
+            assert await ArquivoService().arquivar(settings.arquivo_horizonte_dias, 100, hoje=hoje) == 3
+
+            # Com a tabela quente vazia, um novo lançamento ainda recebe um ID novo
+            nova = (await client.post(f"/transacoes/contas/{conta['id']}", json={"tipo": "deposito", "valor": 5})).json()
+            assert nova["id"] > max(ids)
+            assert (await TransacaoService().get_by_id(ids[0])).valor == 10
+
+            extrato = (await client.get(f"/transacoes/contas/{conta['id']}/extrato")).json()
+            assert [t["id"] for t in extrato["transacoes"]] == [nova["id"], *reversed(ids)]
+
+    asyncio.run(cenario())
+
+
+def test_init_schema_migra_transacoes_sem_autoincrement(tmp_path, monkeypatch):
+    caminho = tmp_path / "antigo.db"
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(
+        """
+        CREATE TABLE contas (id INTEGER PRIMARY KEY, numero VARCHAR(20), titular VARCHAR(100), saldo FLOAT);
+        CREATE TABLE transacoes (
+            id INTEGER PRIMARY KEY, conta_id INTEGER REFERENCES contas (id), tipo VARCHAR(10),
+            valor FLOAT, descricao VARCHAR(255), created_at DATETIME
+        );
+        CREATE INDEX ix_transacoes_conta_id ON transacoes (conta_id);
+        INSERT INTO contas VALUES (1, '1', 'A', 0);
+        INSERT INTO transacoes VALUES (1, 1, 'deposito', 10, NULL, '2020-01-01 00:00:00');
+        INSERT INTO transacoes VALUES (2, 1, 'deposito', 20, NULL, '2020-01-02 00:00:00');
+        """
+    )
+    conexao.close()
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{caminho}")
+
+    init_schema()
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("INSERT INTO transacoes_arquivo SELECT * FROM transacoes WHERE id = 2")
+    conexao.execute("DELETE FROM transacoes WHERE id = 2")
+    conexao.execute("INSERT INTO transacoes (conta_id, tipo, valor) VALUES (1, 'deposito', 5)")
+    conexao.commit()
+
+    ddl = conexao.execute("SELECT sql FROM sqlite_master WHERE name = 'transacoes'").fetchone()[0]
+    assert "AUTOINCREMENT" in ddl
+    assert [row[0] for row in conexao.execute("SELECT id FROM transacoes ORDER BY id")] == [1, 3]
+    referencia = conexao.execute("SELECT sql FROM sqlite_master WHERE name = 'transferencias'").fetchone()[0]
+    assert "transacoes_antiga" not in referencia
+    conexao.close()
+
+    # Uma segunda execução não altera a tabela já migrada
+    init_schema()
+
+
+def test_pernas_de_transferencia_arquivadas_nao_deixam_referencias_pendentes():
+    async def cenario():
+        async with cliente() as client:
+            origem = (await client.post("/contas/", json={"numero": "arq-2", "titular": "Origem"})).json()
+            destino = (await client.post("/contas/", json={"numero": "arq-3", "titular": "Destino"})).json()
+            await client.post(f"/transacoes/contas/{origem['id']}", json={"tipo": "deposito", "valor": 50})
+            transferencia = (
+                await client.post(
+                    "/transferencias",
+                    json={"conta_origem_id": origem["id"], "conta_destino_id": destino["id"], "valor": 20},
+                )
+            ).json()
+            await database.execute(
+                transacoes.update()
+                .where(transacoes.c.conta_id.in_([origem["id"], destino["id"]]))
+                .values(created_at=datetime(2020, 1, 1))
+            )
+
+            await database.execute("PRAGMA foreign_keys = ON")
+            try:
+                hoje = date.today() + timedelta(days=1)
+                assert await ArquivoService().arquivar(settings.arquivo_horizonte_dias, 100, hoje=hoje) >= 3
+                assert await database.fetch_all("PRAGMA foreign_key_check") == []
+            finally:
+                await database.execute("PRAGMA foreign_keys = OFF")
+
+            gravada = await database.fetch_one(transferencias.select().where(transferencias.c.id == transferencia["id"]))
+            for transacao_id in (gravada.transacao_debito_id, gravada.transacao_credito_id):
+                assert (await TransacaoService().get_by_id(transacao_id)).valor == 20
+
+    asyncio.run(cenario())
+
+
+def test_init_schema_remove_chaves_de_transferencias_para_transacoes(tmp_path, monkeypatch):
+    caminho = tmp_path / "transferencias.db"
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(
+        """
+        CREATE TABLE contas (id INTEGER PRIMARY KEY, numero VARCHAR(20), titular VARCHAR(100), saldo FLOAT);
+        CREATE TABLE transacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, conta_id INTEGER REFERENCES contas (id), tipo VARCHAR(10),
+            valor FLOAT, descricao VARCHAR(255), created_at DATETIME
+        );
+        CREATE TABLE transferencias (
+            id INTEGER PRIMARY KEY, conta_origem_id INTEGER NOT NULL REFERENCES contas (id),
+            conta_destino_id INTEGER NOT NULL REFERENCES contas (id), valor FLOAT NOT NULL, descricao VARCHAR(255),
+            transacao_debito_id INTEGER NOT NULL UNIQUE REFERENCES transacoes (id),
+            transacao_credito_id INTEGER NOT NULL UNIQUE REFERENCES transacoes (id), created_at DATETIME
+        );
+        CREATE INDEX ix_transferencias_conta_origem_id ON transferencias (conta_origem_id);
+        INSERT INTO transferencias VALUES (1, 1, 2, 20, NULL, 1, 2, '2020-01-01 00:00:00');
+        """
+    )
+    conexao.close()
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{caminho}")
+
+    init_schema()
+    conexao = sqlite3.connect(caminho)
+    ddl = conexao.execute("SELECT sql FROM sqlite_master WHERE name = 'transferencias'").fetchone()[0]
+    assert "REFERENCES transacoes" not in ddl
+    assert conexao.execute("SELECT transacao_debito_id, transacao_credito_id FROM transferencias").fetchall() == [(1, 2)]
+    conexao.close()
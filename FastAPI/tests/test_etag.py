@@ -0,0 +1,42 @@
+import asyncio
+
+from conftest import cliente
+
+from src.database import database
+from src.models.conta import contas
+
+
+def test_etag_acompanha_o_saldo_mesmo_com_conta_em_cache_desatualizada():
+    async def cenario():
+        async with cliente() as client:
+            conta = (await client.post("/contas/", json={"numero": "etag-1", "titular": "ETag"})).json()
+            url = f"/contas/{conta['id']}"
+            await client.post(f"/transacoes/contas/{conta['id']}", json={"tipo": "deposito", "valor": 10})
+            await client.get(url)
+
+            # Outro processo lança na conta: o cache deste ainda tem o saldo antigo
+            await database.execute(
+                "INSERT INTO transacoes (conta_id, tipo, valor) VALUES (:conta_id, 'deposito', 5)",
+                {"conta_id": conta["id"]},
+            )
+            await database.execute(contas.update().where(contas.c.id == conta["id"]).values(saldo=15.0))
+
+            for caminho in (url, f"/transacoes/contas/{conta['id']}/extrato"):
+                resposta = await client.get(caminho)
+                saldo = resposta.json().get("saldo", resposta.json().get("saldo_atual"))
+                assert saldo == 15.0
+                repetida = await client.get(caminho, headers={"If-None-Match": resposta.headers["ETag"]})
+                assert repetida.status_code == 304
+
+    asyncio.run(cenario())
+
+
+def test_if_none_match_em_conta_inexistente_responde_404():
+    async def cenario():
+        async with cliente() as client:
+            for caminho in ("/contas/999999", "/transacoes/contas/999999/extrato"):
+                for etag in ("*", 'W/"999999-0"'):
+                    resposta = await client.get(caminho, headers={"If-None-Match": etag})
+                    assert resposta.status_code == 404
+
+    asyncio.run(cenario())
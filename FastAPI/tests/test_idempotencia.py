@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from conftest import cliente
+
+from src.config import settings
+from src.database import database
+from src.models.idempotencia import idempotencias
+from src.services.idempotencia import resposta_cache
+
+
+def test_chave_expirada_ainda_nao_removida_lanca_novamente():
+    async def cenario():
+        async with cliente() as client:
+            conta = (await client.post("/contas/", json={"numero": "idem-1", "titular": "Idempotência"})).json()
+            url = f"/transacoes/contas/{conta['id']}"
+            headers = {"Idempotency-Key": "chave-expirada"}
+
+            primeira = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+            repetida = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+            assert repetida.json() == primeira.json()
+
+            # Expira a resposta sem removê-la, como antes do job de purge
+            await database.execute(idempotencias.update().values(created_at=datetime(2000, 1, 1)))
+            resposta_cache.clear()
+
+            nova = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+            assert nova.status_code == 201
+            assert nova.json()["id"] != primeira.json()["id"]
+            assert (await client.get(f"/contas/{conta['id']}")).json()["saldo"] == 20
+
+            repetida = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+            assert repetida.json() == nova.json()
+
+    asyncio.run(cenario())
+
+
+def test_chave_reutilizada_em_outra_requisicao_e_recusada():
+    async def cenario():
+        async with cliente() as client:
+            conta_a = (await client.post("/contas/", json={"numero": "idem-2", "titular": "Conta A"})).json()
+            conta_b = (await client.post("/contas/", json={"numero": "idem-3", "titular": "Conta B"})).json()
+            await client.post(f"/transacoes/contas/{conta_b['id']}", json={"tipo": "deposito", "valor": 1000})
+            headers = {"Idempotency-Key": "chave-reutilizada"}
+
+            deposito = {"tipo": "deposito", "valor": 10}
+            primeira = await client.post(f"/transacoes/contas/{conta_a['id']}", json=deposito, headers=headers)
+            assert primeira.status_code == 201
+
+            outra_conta = await client.post(f"/transacoes/contas/{conta_b['id']}", json=deposito, headers=headers)
+            assert outra_conta.status_code == 422
+            saque = {"tipo": "saque", "valor": 999}
+            outro_corpo = await client.post(f"/transacoes/contas/{conta_a['id']}", json=saque, headers=headers)
+            assert outro_corpo.status_code == 422
+
+            # A recusa vale também para a resposta lida do banco, sem o cache
+            resposta_cache.clear()
+            outra_conta = await client.post(f"/transacoes/contas/{conta_b['id']}", json=saque, headers=headers)
+            assert outra_conta.status_code == 422
+            assert (await client.get(f"/contas/{conta_b['id']}")).json()["saldo"] == 1000
+
+            repetida = await client.post(f"/transacoes/contas/{conta_a['id']}", json=deposito, headers=headers)
+            assert repetida.json() == primeira.json()
+
+    asyncio.run(cenario())
+
+
+def test_cache_expira_junto_com_a_resposta_registrada():
+    async def cenario():
+        async with cliente() as client:
+            conta = (await client.post("/contas/", json={"numero": "idem-4", "titular": "Idempotência"})).json()
+            url = f"/transacoes/contas/{conta['id']}"
+            headers = {"Idempotency-Key": "chave-quase-expirada"}
+            primeira = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+
+            # Registrada quase um TTL atrás: o cache só pode guardá-la pelo que resta da validade
+            quase_expirada = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+                seconds=settings.idempotency_ttl_seconds - 0.5
+            )
+            await database.execute(
+                idempotencias.update().where(idempotencias.c.chave == "chave-quase-expirada").values(
+                    created_at=quase_expirada
+                )
+            )
+            resposta_cache.clear()
+            repetida = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+            assert repetida.json() == primeira.json()
+
+            await asyncio.sleep(1)
+            nova = await client.post(url, json={"tipo": "deposito", "valor": 10}, headers=headers)
+            assert nova.status_code == 201
+            assert nova.json()["id"] != primeira.json()["id"]
+
+    asyncio.run(cenario())
@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+from conftest import cliente
+
+from src.events import broker
+
+
+def test_lote_publica_as_transacoes_criadas_para_os_ouvintes_da_conta():
+    async def cenario():
+        async with cliente() as client:
+            conta = (await client.post("/contas/", json={"numero": "lote-1", "titular": "Lote"})).json()
+            itens = [
+                {"conta_id": conta["id"], "tipo": "deposito", "valor": 10},
+                {"conta_id": conta["id"], "tipo": "saque", "valor": 50},
+                {"conta_id": conta["id"], "tipo": "saque", "valor": 4},
+            ]
+            with broker.subscribe(conta["id"]) as assinatura:
+                resposta = (await client.post("/transacoes/lote", json={"transacoes": itens})).json()
+                eventos = [json.loads(await asyncio.wait_for(assinatura.get(), 1)) for _ in range(2)]
+
+            ids = [resultado["id"] for resultado in resposta["resultados"]]
+            assert ids[1] is None
+            assert [evento["transacao"]["id"] for evento in eventos] == [ids[0], ids[2]]
+            assert [evento["saldo"] for evento in eventos] == [10.0, 6.0]
+            assert eventos[0]["transacao"]["created_at"]
+
+    asyncio.run(cenario())